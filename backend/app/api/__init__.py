@@ -1,11 +1,13 @@
 from fastapi import APIRouter
 
-from . import offers, products, scraper
+from . import archive, offers, products, scraper, stats
 
 api_router = APIRouter(prefix="/api")
 
 api_router.include_router(products.router, prefix="/products", tags=["products"])
 api_router.include_router(offers.router, prefix="/offers", tags=["offers"])
 api_router.include_router(scraper.router, prefix="/scraper", tags=["scraper"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(archive.router, prefix="/archive", tags=["archive"])
 
 
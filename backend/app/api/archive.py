@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from ..database import get_read_session
+from ..models import OfferArchive
+from ..schemas import ArchivedOfferDetail, ArchivedOfferOut, ArchivedOfferPage
+
+
+router = APIRouter()
+
+
+ARCHIVE_PAGE_DEFAULT_LIMIT = 50
+ARCHIVE_PAGE_MAX_LIMIT = 500
+ARCHIVE_FIELDS = tuple(ArchivedOfferOut.model_fields)
+
+
+@router.get("/offers", response_model=ArchivedOfferPage)
+async def list_archived_offers(
+    product_id: int | None = None,
+    status_filter: str | None = Query(None, alias="status"),
+    limit: int = Query(ARCHIVE_PAGE_DEFAULT_LIMIT, ge=1, le=ARCHIVE_PAGE_MAX_LIMIT),
+    after: int | None = Query(None, description="next_cursor der vorherigen Seite"),
+    session: AsyncSession = Depends(get_read_session),
+) -> ArchivedOfferPage:
+    """Archivierte Angebote (nur lesend), neueste id zuerst; ohne Historie und Kontakte."""
+    conditions = []
+    if product_id:
+        conditions.append(OfferArchive.product_id == product_id)
+    if status_filter:
+        conditions.append(OfferArchive.status == status_filter)
+    if after is not None:
+        conditions.append(OfferArchive.id < after)
+
+    stmt = select(*(getattr(OfferArchive, field) for field in ARCHIVE_FIELDS))
+    if conditions:
+        stmt = stmt.where(and_(*conditions))
+    rows = (await session.execute(stmt.order_by(OfferArchive.id.desc()).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+    return ArchivedOfferPage(
+        items=[ArchivedOfferOut.model_validate(row._mapping) for row in rows], next_cursor=next_cursor
+    )
+
+
+@router.get("/offers/{offer_id}", response_model=ArchivedOfferDetail)
+async def get_archived_offer(
+    offer_id: int,
+    session: AsyncSession = Depends(get_read_session),
+) -> OfferArchive:
+    offer = await session.get(
+        OfferArchive, offer_id, options=[undefer(OfferArchive.price_history), undefer(OfferArchive.contacts)]
+    )
+    if not offer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archived offer not found")
+    return offer
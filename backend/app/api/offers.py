@@ -1,27 +1,81 @@
-from collections.abc import Sequence
-from datetime import datetime
+import asyncio
+import base64
+from collections.abc import AsyncGenerator, Callable, Sequence
+from datetime import datetime, timedelta
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import Select, and_, select
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from redis.asyncio import Redis
+from sqlalchemy import ColumnElement, Select, and_, func, literal, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_session
+from ..cache import get_optional_redis
+from ..config import get_settings
+from ..database import get_read_session, get_session
 from ..models import Offer, PriceHistory
-from ..schemas import OfferCreate, OfferOut, OfferUpdateStatus, PriceHistoryOut
+from ..schemas import (
+    OfferBulkCreate,
+    OfferBulkResult,
+    OfferBulkStatusResult,
+    OfferBulkStatusUpdate,
+    OfferCreate,
+    OfferLivenessBatch,
+    OfferLivenessResult,
+    OfferOut,
+    OfferPage,
+    OfferTouch,
+    OfferTouchResult,
+    OfferUpdateStatus,
+    PriceHistoryBucketOut,
+    PriceHistoryOut,
+    StaleOfferOut,
+)
+from ..services.events import offer_events
+from ..services.geo import DEFAULT_RADIUS_KM, offer_coordinates, radius_condition, resolve_near
+from ..services.ingest import touch_offers, upsert_offers
+from ..services.liveness import apply_liveness, select_stale_offers
+from ..services.reference_prices import reference_prices
+from ..services.stats import mark_stats_dirty
+from ..services.triage import update_offer_statuses
+from ..services.versions import (
+    OFFERS_VERSION_KEY,
+    bump_version,
+    cache_headers,
+    collection_etag,
+    etag_matches,
+)
 
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[OfferOut])
-async def list_offers(
-    status_filter: str | None = Query(None, alias="status"),
-    product_id: int | None = None,
-    min_margin: float | None = None,
-    session: AsyncSession = Depends(get_session),
-) -> Sequence[Offer]:
-    stmt: Select[tuple[Offer]] = select(Offer)
+OFFER_PAGE_DEFAULT_LIMIT = 50
+OFFER_PAGE_MAX_LIMIT = 500
+OFFER_FIELDS = tuple(OfferOut.model_fields)
+
+
+def _encode_cursor(sort_key: datetime | float, offer_id: int) -> str:
+    key = sort_key.isoformat() if isinstance(sort_key, datetime) else repr(sort_key)
+    return base64.urlsafe_b64encode(f"{key}|{offer_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str, parse_key: Callable[[str], Any] = datetime.fromisoformat) -> tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        sort_key, offer_id = raw.rsplit("|", 1)
+        return parse_key(sort_key), int(offer_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
 
+
+def _offer_filters(
+    status_filter: str | None,
+    product_id: int | None,
+    min_margin: float | None,
+) -> list[ColumnElement[bool]]:
     conditions = []
     if status_filter:
         conditions.append(Offer.status == status_filter)
@@ -29,14 +83,212 @@ async def list_offers(
         conditions.append(Offer.product_id == product_id)
     if min_margin is not None:
         conditions.append(Offer.margin_percent >= min_margin)
+    return conditions
+
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    """Parse `fields=id,title,price` in eine validierte Spaltenliste."""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(OFFER_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return list(dict.fromkeys(requested))
+
+
+@router.get("", response_model=OfferPage)
+async def list_offers(
+    request: Request,
+    status_filter: str | None = Query(None, alias="status"),
+    product_id: int | None = None,
+    min_margin: float | None = None,
+    limit: int = Query(OFFER_PAGE_DEFAULT_LIMIT, ge=1, le=OFFER_PAGE_MAX_LIMIT),
+    after: str | None = Query(None, description="next_cursor der vorherigen Seite"),
+    fields: str | None = Query(None, description="Kommagetrennte Feldliste, z.B. id,title,price"),
+    near: str | None = Query(None, description="PLZ, Ort oder \"Breite,Länge\" für die Umkreissuche"),
+    radius_km: float = Query(DEFAULT_RADIUS_KM, gt=0, le=1000),
+    session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
+) -> Response:
+    """Angebotsliste mit Keyset-Pagination, optional im Umkreis von `near`.
+
+    Schneller Pfad: es werden nur Spalten-Tupel (keine ORM-Entities) geladen und direkt
+    per orjson serialisiert, ohne Pydantic-Validierung pro Zeile. Das Schema in OpenAPI
+    bleibt `OfferPage`. Passt `If-None-Match` zum ETag der Tabellenversion, kommt 304
+    ohne Datenbankabfrage. Liest von der Primary, nicht von der Replica: die Version
+    zählt beim Commit auf der Primary hoch, eine nachlaufende Replica würde sonst einen
+    veralteten Stand unter dem neuen ETag ausliefern.
+    """
+    # Version vor der Abfrage lesen: ein Schreibzugriff dazwischen führt höchstens zu
+    # einem unnötigen Neuladen, nie zu veralteten Daten unter neuem ETag
+    etag = await collection_etag(redis, OFFERS_VERSION_KEY)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+
+    selected_fields = _parse_fields(fields) or list(OFFER_FIELDS)
+
+    # first_seen_at und id werden immer geladen, da der Cursor daraus gebaut wird
+    columns = dict.fromkeys([*selected_fields, "first_seen_at", "id"])
+    stmt: Select = select(*(getattr(Offer, column) for column in columns))
+
+    conditions = _offer_filters(status_filter, product_id, min_margin)
+    if near:
+        center = resolve_near(near)
+        if center is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown location")
+        conditions.append(radius_condition(center, radius_km, Offer.latitude, Offer.longitude))
+    if after:
+        cursor_first_seen_at, cursor_id = _decode_cursor(after)
+        conditions.append(
+            tuple_(Offer.first_seen_at, Offer.id) < tuple_(cursor_first_seen_at, cursor_id)
+        )
 
     if conditions:
         stmt = stmt.where(and_(*conditions))
 
-    stmt = stmt.order_by(Offer.first_seen_at.desc())
+    # Eine Zeile mehr laden, um zu erkennen, ob es eine nächste Seite gibt
+    stmt = stmt.order_by(Offer.first_seen_at.desc(), Offer.id.desc()).limit(limit + 1)
 
     result = await session.execute(stmt)
-    return result.scalars().all()
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].first_seen_at, rows[-1].id)
+
+    items = [{field: getattr(row, field) for field in selected_fields} for row in rows]
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor}, headers=cache_headers(etag))
+
+
+@router.get("/search", response_model=OfferPage)
+async def search_offers(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=200),
+    status_filter: str | None = Query(None, alias="status"),
+    product_id: int | None = None,
+    min_margin: float | None = None,
+    limit: int = Query(OFFER_PAGE_DEFAULT_LIMIT, ge=1, le=OFFER_PAGE_MAX_LIMIT),
+    after: str | None = Query(None, description="next_cursor der vorherigen Seite"),
+    session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
+) -> Response:
+    """Volltextsuche über Titel und Beschreibung, nach Relevanz sortiert.
+
+    Treffer über den `search_vector` (deutsch + simple, GIN-Index) oder per Trigramm-
+    Wortähnlichkeit im Titel (für Modellnummern wie "3080ti"). Cursor: (Rang, id).
+    ETag/304 und Primary-Session wie bei `list_offers`.
+    """
+    etag = await collection_etag(redis, OFFERS_VERSION_KEY)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+
+    query = func.websearch_to_tsquery(literal_column("'german'::regconfig"), q).op("||")(
+        func.websearch_to_tsquery(literal_column("'simple'::regconfig"), q)
+    )
+    rank = (func.ts_rank_cd(Offer.search_vector, query) + func.word_similarity(q, Offer.title)).label("rank")
+
+    conditions = _offer_filters(status_filter, product_id, min_margin)
+    conditions.append(or_(Offer.search_vector.op("@@")(query), literal(q).op("<%")(Offer.title)))
+    if after:
+        cursor_rank, cursor_id = _decode_cursor(after, float)
+        conditions.append(tuple_(rank, Offer.id) < tuple_(cursor_rank, cursor_id))
+
+    stmt = (
+        select(*(getattr(Offer, field) for field in OFFER_FIELDS), rank)
+        .where(and_(*conditions))
+        .order_by(rank.desc(), Offer.id.desc())
+        .limit(limit + 1)
+    )
+    rows = (await session.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].rank, rows[-1].id)
+
+    items = [{field: getattr(row, field) for field in OFFER_FIELDS} for row in rows]
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor}, headers=cache_headers(etag))
+
+
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+@router.get("/stale", response_model=list[StaleOfferOut])
+async def list_stale_offers(
+    older_than_hours: int | None = Query(None, ge=1),
+    limit: int = Query(200, ge=1, le=OFFER_PAGE_MAX_LIMIT),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[StaleOfferOut]:
+    """Offene Angebote für den Liveness-Re-Check, höchste Marge zuerst."""
+    hours = older_than_hours or get_settings().offer_stale_hours
+    return await select_stale_offers(session, timedelta(hours=hours), limit)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_offers(
+    request: Request,
+    status_filter: str | None = Query(None, alias="status"),
+    product_id: int | None = None,
+    min_margin: float | None = None,
+) -> StreamingResponse:
+    """Server-Sent Events für neue und geänderte Angebote (Filter wie bei `list_offers`).
+
+    Gespeist per Postgres LISTEN/NOTIFY (Trigger auf `offers`); alle 15 s ein Keepalive-Kommentar.
+    """
+
+    def matches(event: dict[str, Any]) -> bool:
+        if status_filter and event["status"] != status_filter:
+            return False
+        if product_id and event["product_id"] != product_id:
+            return False
+        margin = event["margin_percent"]
+        return min_margin is None or (margin is not None and margin >= min_margin)
+
+    queue = await offer_events.subscribe()
+
+    async def event_stream() -> AsyncGenerator[bytes, None]:
+        try:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if matches(event):
+                    yield b"event: offer\ndata: " + orjson.dumps(event) + b"\n\n"
+        finally:
+            offer_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # nginx soll den Stream nicht puffern
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.patch("/status", response_model=OfferBulkStatusResult)
+async def update_offer_statuses_bulk(
+    payload: OfferBulkStatusUpdate,
+    session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
+) -> OfferBulkStatusResult:
+    """Statuswechsel für eine id-Auswahl oder alle Angebote eines Filters in einem UPDATE.
+
+    Beispiel: `{"status": "ignored", "filters": {"product_id": 7, "max_margin": 10}}`.
+    Mit `dry_run` nur zählen.
+    """
+    result = await update_offer_statuses(session, payload)
+    if result.ids:
+        await mark_stats_dirty(redis)
+        await bump_version(redis, OFFERS_VERSION_KEY)
+    return result
 
 
 @router.get("/{offer_id}", response_model=OfferOut)
@@ -55,6 +307,7 @@ async def update_offer_status(
     offer_id: int,
     payload: OfferUpdateStatus,
     session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
 ) -> Offer:
     offer = await session.get(Offer, offer_id)
     if not offer:
@@ -65,32 +318,107 @@ async def update_offer_status(
 
     await session.commit()
     await session.refresh(offer)
+    await mark_stats_dirty(redis)
+    await bump_version(redis, OFFERS_VERSION_KEY)
     return offer
 
 
-@router.get("/{offer_id}/history", response_model=list[PriceHistoryOut])
+HISTORY_BUCKETS = {"1h": "hour", "1d": "day"}
+
+
+@router.get("/{offer_id}/history", response_model=list[PriceHistoryOut] | list[PriceHistoryBucketOut])
 async def get_offer_history(
     offer_id: int,
-    session: AsyncSession = Depends(get_session),
-) -> Sequence[PriceHistory]:
+    bucket: Literal["1h", "1d"] | None = Query(None, description="Aggregation pro Stunde/Tag"),
+    since: datetime | None = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> Sequence[PriceHistory] | Sequence[dict[str, Any]]:
+    conditions = [PriceHistory.offer_id == offer_id]
+    if since is not None:
+        conditions.append(PriceHistory.recorded_at >= since)
+
+    if bucket is None:
+        stmt = select(PriceHistory).where(*conditions).order_by(PriceHistory.recorded_at.desc())
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    # Rohpunkte und verdichtete Tageszeilen werden gemeinsam aggregiert
+    bucket_start = func.date_trunc(HISTORY_BUCKETS[bucket], PriceHistory.recorded_at).label("bucket_start")
     stmt = (
-        select(PriceHistory)
-        .where(PriceHistory.offer_id == offer_id)
-        .order_by(PriceHistory.recorded_at.desc())
+        select(
+            bucket_start,
+            func.min(func.coalesce(PriceHistory.price_min, PriceHistory.price)).label("price_min"),
+            func.max(func.coalesce(PriceHistory.price_max, PriceHistory.price)).label("price_max"),
+            array_agg(aggregate_order_by(PriceHistory.price, PriceHistory.recorded_at.desc()))[1].label(
+                "price_last"
+            ),
+            func.sum(PriceHistory.samples).label("samples"),
+        )
+        .where(*conditions)
+        .group_by(bucket_start)
+        .order_by(bucket_start.desc())
     )
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return result.mappings().all()
 
 
 @router.post("", response_model=OfferOut, status_code=status.HTTP_201_CREATED)
 async def create_offer(
     payload: OfferCreate,
     session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
 ) -> Offer:
-    offer = Offer(**payload.model_dump())
+    offer = Offer(**payload.model_dump(), **offer_coordinates(payload.location))
     session.add(offer)
     await session.commit()
     await session.refresh(offer)
+    await mark_stats_dirty(redis)
+    await bump_version(redis, OFFERS_VERSION_KEY)
     return offer
 
 
+@router.post("/bulk", response_model=OfferBulkResult)
+async def bulk_upsert_offers(
+    payload: OfferBulkCreate,
+    session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
+) -> OfferBulkResult:
+    # Referenzpreise vor der Margenberechnung auffrischen: ein Abruf pro Produkt und Quelle, nicht pro Angebot.
+    # Hängt eine Quelle, rechnet der Upsert mit den gespeicherten Preisen; der Abruf korrigiert die Margen später.
+    await reference_prices.get_many(
+        {offer.product_id for offer in payload.offers}, timeout=get_settings().reference_price_ingest_timeout
+    )
+    result = await upsert_offers(session, payload.offers)
+    if result.created or result.updated:
+        await mark_stats_dirty(redis)
+        await bump_version(redis, OFFERS_VERSION_KEY)
+    return result
+
+
+@router.post("/touch", response_model=OfferTouchResult)
+async def touch_offers_by_url(
+    payload: OfferTouch,
+    session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
+) -> OfferTouchResult:
+    """Markiere unverändert wiedergefundene Angebote als geprüft (ohne Upsert)."""
+    result = await touch_offers(session, payload.urls)
+    # last_checked_at ist Teil der Angebotsliste
+    if result.touched:
+        await bump_version(redis, OFFERS_VERSION_KEY)
+    return result
+
+
+@router.post("/liveness", response_model=OfferLivenessResult)
+async def record_offer_liveness(
+    payload: OfferLivenessBatch,
+    session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
+) -> OfferLivenessResult:
+    """Übernimm Re-Check-Ergebnisse des Scrapers gesammelt in einem UPDATE."""
+    result = await apply_liveness(session, payload.results)
+    if result.expired:
+        await mark_stats_dirty(redis)
+    if result.checked:
+        await bump_version(redis, OFFERS_VERSION_KEY)
+    return result
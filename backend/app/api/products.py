@@ -1,34 +1,77 @@
-from collections.abc import Sequence
-
-from fastapi import APIRouter, Depends, HTTPException, status
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..cache import get_optional_redis
 from ..database import get_session
 from ..models import Product
 from ..schemas import ProductCreate, ProductOut, ProductUpdate
+from ..services.versions import (
+    CATALOG_CHANNEL,
+    OFFERS_VERSION_KEY,
+    PRODUCTS_VERSION_KEY,
+    bump_version,
+    cache_headers,
+    collection_etag,
+    etag_matches,
+)
+
 
+logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
 
+PRODUCT_COLUMNS = tuple(getattr(Product, field) for field in ProductOut.model_fields)
+
+
+async def _products_changed(redis: Redis | None, *also: str) -> None:
+    # Nach dem Commit: Scraper laden ihren Katalog neu, sobald sie die Version sehen.
+    # Scheitert Redis, bleibt es beim Log-Eintrag; die Scraper sehen die Änderung dann mit
+    # dem nächsten Versionssprung.
+    versions = await bump_version(redis, PRODUCTS_VERSION_KEY, *also)
+    if redis is None or versions is None:
+        return
+    try:
+        await redis.publish(CATALOG_CHANNEL, versions[0])
+    except RedisError as e:
+        logger.warning("catalog_publish_failed", error=str(e))
+
+
 @router.get("", response_model=list[ProductOut])
 async def list_products(
+    request: Request,
     session: AsyncSession = Depends(get_session),
-) -> Sequence[Product]:
-    result = await session.execute(select(Product).order_by(Product.id))
-    return result.scalars().all()
+    redis: Redis | None = Depends(get_optional_redis),
+) -> Response:
+    """Produktliste als Spalten-Tupel, direkt per orjson serialisiert (Schema bleibt `ProductOut`).
+
+    304 ohne Datenbankabfrage, wenn `If-None-Match` zur Tabellenversion passt. Liest wie
+    `list_offers` von der Primary, damit ETag und Inhalt zum selben Stand gehören.
+    """
+    etag = await collection_etag(redis, PRODUCTS_VERSION_KEY)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+
+    result = await session.execute(select(*PRODUCT_COLUMNS).order_by(Product.id))
+    return ORJSONResponse([dict(row) for row in result.mappings()], headers=cache_headers(etag))
 
 
 @router.post("", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
 async def create_product(
     payload: ProductCreate,
     session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
 ) -> Product:
     product = Product(**payload.model_dump())
     session.add(product)
     await session.commit()
     await session.refresh(product)
+    await _products_changed(redis)
     return product
 
 
@@ -37,6 +80,7 @@ async def update_product(
     product_id: int,
     payload: ProductUpdate,
     session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
 ) -> Product:
     product = await session.get(Product, product_id)
     if not product:
@@ -48,6 +92,7 @@ async def update_product(
 
     await session.commit()
     await session.refresh(product)
+    await _products_changed(redis)
     return product
 
 
@@ -55,6 +100,7 @@ async def update_product(
 async def delete_product(
     product_id: int,
     session: AsyncSession = Depends(get_session),
+    redis: Redis | None = Depends(get_optional_redis),
 ) -> None:
     product = await session.get(Product, product_id)
     if not product:
@@ -62,5 +108,7 @@ async def delete_product(
 
     await session.delete(product)
     await session.commit()
+    # Angebote des Produkts werden per Cascade mitgelöscht
+    await _products_changed(redis, OFFERS_VERSION_KEY)
 
 
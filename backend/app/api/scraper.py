@@ -1,23 +1,34 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, status
+from redis.asyncio import Redis
+
+from ..cache import get_redis
 
 router = APIRouter()
 
+# Gemeinsame Redis-Keys mit scraper/control.py
+DESIRED_STATE_KEY = "scraper:desired_state"
+STATUS_KEY = "scraper:status"
+
 
 @router.post("/start", status_code=status.HTTP_202_ACCEPTED)
-async def start_scraper() -> dict:
-    # TODO: Celery-Task triggern (z.B. periodic scraping aktivieren)
+async def start_scraper(redis: Redis = Depends(get_redis)) -> dict:
+    await redis.set(DESIRED_STATE_KEY, "running")
     return {"detail": "Scraper start requested"}
 
 
 @router.get("/status")
-async def scraper_status() -> dict:
-    # TODO: Echten Status aus Redis/Celery lesen
-    return {"status": "unknown", "detail": "Scraper status endpoint not yet implemented"}
+async def scraper_status(redis: Redis = Depends(get_redis)) -> dict:
+    desired_state = await redis.get(DESIRED_STATE_KEY) or "stopped"
+    live_status = await redis.hgetall(STATUS_KEY)
+    # Der Scraper schreibt den Status mit TTL; fehlt er, läuft kein Scraper-Prozess
+    return {
+        "status": live_status.pop("state", "offline"),
+        "desired_state": desired_state,
+        **live_status,
+    }
 
 
 @router.post("/stop", status_code=status.HTTP_202_ACCEPTED)
-async def stop_scraper() -> dict:
-    # TODO: Celery-Tasks stoppen/Flag setzen
+async def stop_scraper(redis: Redis = Depends(get_redis)) -> dict:
+    await redis.set(DESIRED_STATE_KEY, "stopped")
     return {"detail": "Scraper stop requested"}
-
-
@@ -0,0 +1,22 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import get_optional_redis
+from ..database import get_read_session
+from ..schemas import StatsOut
+from ..services.stats import get_cached_stats
+
+
+router = APIRouter()
+
+
+@router.get("", response_model=StatsOut)
+async def get_stats(
+    session: AsyncSession = Depends(get_read_session),
+    redis: Redis | None = Depends(get_optional_redis),
+) -> dict[str, Any]:
+    """Dashboard-Statistiken aus Materialized Views (Redis-gecacht, konstante Kosten)."""
+    return await get_cached_stats(session, redis)
@@ -0,0 +1,42 @@
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+
+from .config import get_settings
+
+
+settings = get_settings()
+
+_redis: Redis | None = None
+_sync_redis: SyncRedis | None = None
+
+
+def get_redis() -> Redis:
+    """Gemeinsamer async Redis-Client (Connection-Pool intern, lazy erzeugt)."""
+    global _redis
+    if not settings.redis_url:
+        raise RuntimeError("Redis not configured. Please set REDIS_URL in your .env file.")
+    if _redis is None:
+        _redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
+
+
+def get_optional_redis() -> Redis | None:
+    """Wie `get_redis`, aber None ohne REDIS_URL; für Endpoints, die auch ohne Redis antworten."""
+    return get_redis() if settings.redis_url else None
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def get_sync_redis() -> SyncRedis:
+    """Sync Redis-Client für Celery Tasks."""
+    global _sync_redis
+    if not settings.redis_url:
+        raise RuntimeError("Redis not configured. Please set REDIS_URL in your .env file.")
+    if _sync_redis is None:
+        _sync_redis = SyncRedis.from_url(settings.redis_url, decode_responses=True)
+    return _sync_redis
@@ -21,6 +21,17 @@ else:
 class Settings(BaseSettings):
     database_url: str | None = None
     database_url_sync: str | None = None
+    # Optionale Read-Replica für lesende Endpoints ohne ETag (async, asyncpg)
+    database_read_url: str | None = None
+
+    # Connection-Pool (pro Engine und Prozess)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # asyncpg Prepared-Statement-Cache; 0 hinter pgbouncer im Transaction-Mode
+    db_statement_cache_size: int = 100
     redis_url: str | None = None
 
     telegram_bot_token: str | None = None
@@ -30,6 +41,36 @@ class Settings(BaseSettings):
     kleinanzeigen_email: str | None = None
     kleinanzeigen_password: str | None = None
 
+    # Ab dieser Marge (in %) gilt ein Angebot als interessant
+    margin_threshold_percent: float = 20.0
+
+    # Referenzpreise: Quelle -> URL-Template mit {query}, Antwort als JSON {"price": ..., "url": ...}
+    reference_price_sources: dict[str, str] = {}
+    # Cache-TTL wächst mit der Zeit seit der letzten Preisänderung, begrenzt auf [min, max]
+    reference_price_min_ttl: int = 900
+    reference_price_max_ttl: int = 24 * 3600
+    # Einträge, die innerhalb dieses Fensters ablaufen, werden gesammelt vorab erneuert
+    reference_price_refresh_ahead: int = 300
+    reference_price_refresh_interval: int = 60
+    # Höchstens so lange wartet der Bulk-Upsert auf Referenzpreise, danach rechnet er mit den
+    # gespeicherten; laufende Abrufe schreiben ihr Ergebnis im Hintergrund (Margen inklusive)
+    reference_price_ingest_timeout: float = 5.0
+
+    # Offene Angebote, die so lange nicht mehr gesehen wurden, prüft der Scraper erneut
+    offer_stale_hours: int = 24
+
+    # Rohpunkte der Preis-Historie so viele Tage behalten, danach Tagesverdichtung
+    price_history_raw_days: int = 30
+
+    # Abgeschlossene Angebote (rejected, sold, ...) wandern nach so vielen Tagen ins Archiv
+    offer_retention_days: int = 90
+
+    # GeoNames-Postleitzahlen (https://download.geonames.org/export/zip/DE.zip) für Umkreissuchen
+    geo_postcodes_path: str = str(BACKEND_ROOT / "data" / "DE.txt")
+
+    # SQL-Statements ab dieser Dauer werden mit ihrer Route geloggt
+    slow_query_ms: float = 200.0
+
     secret_key: str | None = None
     debug: bool = False
 
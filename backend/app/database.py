@@ -1,8 +1,12 @@
+import time
 from collections.abc import AsyncGenerator
+from functools import lru_cache
+from typing import Any
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from .config import get_settings
 
@@ -14,30 +18,154 @@ class Base(DeclarativeBase):
     pass
 
 
-# Async Engine für FastAPI (asyncpg Driver)
-if settings.database_url:
-    engine = create_async_engine(settings.database_url, echo=settings.debug, future=True)
-    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-else:
-    engine = None
-    AsyncSessionLocal = None
+class _WaitCountingPoolMixin:
+    """Zählt Checkouts, die auf eine freie Connection warten mussten (Pool ausgeschöpft)."""
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_seconds = 0.0
 
-# Sync Engine für Celery (psycopg2 Driver)
-# WICHTIG: Celery benötigt sync SQLAlchemy!
-if settings.database_url_sync:
-    sync_engine = create_engine(settings.database_url_sync, echo=settings.debug, future=True)
-    SyncSessionLocal = sessionmaker(bind=sync_engine, autocommit=False, autoflush=False)
-else:
-    sync_engine = None
-    SyncSessionLocal = None
+    def _do_get(self):
+        exhausted = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+        if not exhausted:
+            return super()._do_get()
+
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.waits += 1
+            self.wait_seconds += time.perf_counter() - started_at
+
+
+class WaitCountingAsyncPool(_WaitCountingPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class WaitCountingPool(_WaitCountingPoolMixin, QueuePool):
+    pass
+
+
+def _pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.debug,
+        future=True,
+        poolclass=WaitCountingAsyncPool,
+        connect_args={"statement_cache_size": settings.db_statement_cache_size},
+        **_pool_options(),
+    )
+
+
+# Engines entstehen erst beim ersten Zugriff: API-Prozesse brauchen nur die async,
+# Celery-Worker nur die sync Engine, und Importe bleiben frei von Pool-Aufbau
+
+
+@lru_cache
+def get_engine() -> AsyncEngine | None:
+    """Async Engine für FastAPI (asyncpg Driver); None ohne DATABASE_URL."""
+    if not settings.database_url:
+        return None
+    from .metrics import instrument_engine
+
+    engine = _create_async_engine(settings.database_url)
+    instrument_engine(engine.sync_engine, "async")
+    return engine
+
+
+@lru_cache
+def get_read_engine() -> AsyncEngine | None:
+    """Lesende Endpoints gehen an die Replica, falls konfiguriert, sonst an die Primary."""
+    if not settings.database_read_url:
+        return get_engine()
+    from .metrics import instrument_engine
+
+    engine = _create_async_engine(settings.database_read_url)
+    instrument_engine(engine.sync_engine, "read")
+    return engine
+
+
+@lru_cache
+def get_sync_engine() -> Engine | None:
+    """Sync Engine für Celery (psycopg2 Driver). WICHTIG: Celery benötigt sync SQLAlchemy!"""
+    if not settings.database_url_sync:
+        return None
+    from .metrics import instrument_engine
+
+    engine = create_engine(
+        settings.database_url_sync,
+        echo=settings.debug,
+        future=True,
+        poolclass=WaitCountingPool,
+        **_pool_options(),
+    )
+    instrument_engine(engine, "sync")
+    return engine
+
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker[AsyncSession] | None:
+    engine = get_engine()
+    return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession) if engine else None
+
+
+@lru_cache
+def get_read_sessionmaker() -> async_sessionmaker[AsyncSession] | None:
+    engine = get_read_engine()
+    return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession) if engine else None
+
+
+@lru_cache
+def get_sync_sessionmaker() -> sessionmaker[Session] | None:
+    engine = get_sync_engine()
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False) if engine else None
+
+
+def new_session() -> AsyncSession:
+    """Async Session außerhalb von Requests (Hintergrund-Tasks im API-Prozess)."""
+    session_factory = get_sessionmaker()
+    if session_factory is None:
+        raise RuntimeError("Database not configured. Please set DATABASE_URL in your .env file.")
+    return session_factory()
+
+
+def pool_status(engine: Any) -> dict[str, int | float]:
+    """Kennzahlen des Connection-Pools einer (async oder sync) Engine."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        # SQLAlchemy zählt noch nicht geöffnete Pool-Connections als negativen Overflow
+        "overflow": max(pool.overflow(), 0),
+        "checked_in": pool.checkedin(),
+        "waits": getattr(pool, "waits", 0),
+        "wait_seconds": round(getattr(pool, "wait_seconds", 0.0), 3),
+    }
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Async Session für FastAPI Endpoints."""
-    if AsyncSessionLocal is None:
+    async with new_session() as session:
+        yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Async Session für rein lesende Endpoints (Read-Replica, falls DATABASE_READ_URL gesetzt)."""
+    session_factory = get_read_sessionmaker()
+    if session_factory is None:
         raise RuntimeError("Database not configured. Please set DATABASE_URL in your .env file.")
-    async with AsyncSessionLocal() as session:
+    async with session_factory() as session:
         yield session
 
 
@@ -47,14 +175,13 @@ def get_sync_session():
     WICHTIG: Verwende diese Funktion nur in Celery Tasks!
     Für FastAPI Endpoints: verwende get_session() (async).
     """
-    if SyncSessionLocal is None:
+    session_factory = get_sync_sessionmaker()
+    if session_factory is None:
         raise RuntimeError(
             "Sync database not configured. Please set DATABASE_URL_SYNC in your .env file."
         )
-    session = SyncSessionLocal()
+    session = session_factory()
     try:
         yield session
     finally:
         session.close()
-
-
@@ -1,13 +1,18 @@
 from contextlib import asynccontextmanager
 
 import structlog
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlalchemy import text
 
 from .api import api_router
+from .cache import close_redis
 from .config import get_settings
-from .database import Base, engine
+from .database import get_engine, get_read_engine, pool_status
+from .metrics import MetricsMiddleware
+from .services.events import offer_events
+from .services.reference_prices import reference_prices
 
 
 logger = structlog.get_logger(__name__)
@@ -16,22 +21,20 @@ settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # DB-Tabellen sicherstellen (für frühe Entwicklung; später durch Alembic ersetzen)
+    # Schema, Views und Trigger kommen aus den Alembic-Migrationen (alembic upgrade head);
+    # die Engine verbindet sich erst mit dem ersten Request
     if settings.database_url:
-        try:
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-            logger.info("backend_started", message="Database connected successfully")
-        except Exception as e:
-            logger.warning(
-                "db_connection_failed",
-                error=str(e),
-                message="Database connection failed. API will start but DB operations will fail.",
-            )
+        logger.info("backend_started", message="Database configured, schema managed by Alembic")
     else:
         logger.info("backend_started", message="Backend started without database (DATABASE_URL not set)")
 
+    if settings.database_url and settings.reference_price_sources:
+        reference_prices.start()
+
     yield
+    await reference_prices.close()
+    await offer_events.close()
+    await close_redis()
     logger.info("backend_stopped")
 
 
@@ -50,6 +53,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router)
 
 
@@ -58,17 +63,27 @@ async def root() -> dict:
     return {"message": "Margin Hunter Backend is running"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus-Metriken im Text-Format."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/health")
 async def health_check() -> dict:
     """Health Check Endpoint für Monitoring und Docker Health Checks."""
     health_status = {"status": "ok"}
     
     # Database Connection Check
+    engine = get_engine()
     if settings.database_url and engine:
         try:
             async with engine.connect() as conn:
                 await conn.execute(text("SELECT 1"))
             health_status["database"] = "connected"
+            health_status["pool"] = pool_status(engine)
+            if get_read_engine() is not engine:
+                health_status["read_pool"] = pool_status(get_read_engine())
         except Exception as e:
             logger.error("health_check_db_failed", error=str(e))
             health_status["database"] = "disconnected"
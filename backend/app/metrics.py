@@ -0,0 +1,123 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import structlog
+from prometheus_client import Counter, Histogram
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+
+
+logger = structlog.get_logger(__name__)
+settings = get_settings()
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP-Latenz pro Route",
+    ["method", "route", "status"],
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "Anzahl SQL-Statements pro Request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+REQUEST_SQL_DURATION = Histogram(
+    "http_request_sql_duration_seconds",
+    "Zeit in der Datenbank pro Request",
+    ["method", "route"],
+)
+SQL_STATEMENTS = Counter("sql_statements_total", "Ausgeführte SQL-Statements", ["engine"])
+SQL_SLOW_STATEMENTS = Counter("sql_slow_statements_total", "SQL-Statements über der Slow-Query-Schwelle", ["engine", "route"])
+REFERENCE_PRICE_LOOKUPS = Counter(
+    "reference_price_lookups_total",
+    "Referenzpreis-Abfragen nach Ergebnis (hit, miss, coalesced)",
+    ["source", "result"],
+)
+REFERENCE_PRICE_FETCHES = Histogram(
+    "reference_price_fetch_duration_seconds",
+    "Dauer eines gebündelten Abrufs bei einer Referenzpreis-Quelle",
+    ["source"],
+)
+
+
+@dataclass
+class RequestSqlStats:
+    scope: Scope
+    statements: int = 0
+    seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # FastAPI trägt die gematchte Route beim Routing in den (geteilten) Scope ein
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+
+# Wird pro Request von der Middleware gesetzt; SQLAlchemy reicht den Kontext an seine Greenlets weiter
+_request_sql_stats: ContextVar[RequestSqlStats | None] = ContextVar("request_sql_stats", default=None)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Hänge Zähl- und Timing-Hooks an eine (sync) Engine; für async Engines `engine.sync_engine` übergeben."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        SQL_STATEMENTS.labels(name).inc()
+
+        stats = _request_sql_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds += elapsed
+
+        if elapsed * 1000 >= settings.slow_query_ms:
+            route = stats.route if stats else "-"
+            SQL_SLOW_STATEMENTS.labels(name, route).inc()
+            logger.warning(
+                "slow_query",
+                engine=name,
+                route=route,
+                duration_ms=round(elapsed * 1000, 1),
+                statement=statement[:500],
+            )
+
+
+class MetricsMiddleware:
+    """ASGI-Middleware: Latenz sowie SQL-Anzahl und -Zeit pro Route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSqlStats(scope)
+        token = _request_sql_stats.set(stats)
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, stats.route, str(status_code)).observe(
+                time.perf_counter() - started_at
+            )
+            REQUEST_SQL_STATEMENTS.labels(method, stats.route).observe(stats.statements)
+            REQUEST_SQL_DURATION.labels(method, stats.route).observe(stats.seconds)
+            _request_sql_stats.reset(token)
@@ -1,5 +1,7 @@
 from .product import Product
 from .offer import Offer
+from .offer_archive import OfferArchive
+from .offer_lsh_bucket import OfferLshBucket
 from .price_history import PriceHistory
 from .contact import Contact
 from .price_reference import PriceReference
@@ -7,6 +9,8 @@ from .price_reference import PriceReference
 __all__ = [
     "Product",
     "Offer",
+    "OfferArchive",
+    "OfferLshBucket",
     "PriceHistory",
     "Contact",
     "PriceReference",
@@ -1,13 +1,40 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Computed, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..database import Base
 
 
+# Angebote in diesen Status werden nicht mehr aktiv verfolgt (keine Margen-Updates etc.)
+CLOSED_OFFER_STATUSES = ("rejected", "ignored", "sold", "expired", "duplicate")
+
+
 class Offer(Base):
     __tablename__ = "offers"
+    __table_args__ = (
+        # Keyset-Pagination: Sortierung (first_seen_at DESC, id DESC) pro Filterkombination
+        Index("ix_offers_first_seen_id", "first_seen_at", "id"),
+        Index("ix_offers_status_first_seen_id", "status", "first_seen_at", "id"),
+        Index("ix_offers_product_first_seen_id", "product_id", "first_seen_at", "id"),
+        Index("ix_offers_product_status_first_seen_id", "product_id", "status", "first_seen_at", "id"),
+        # min_margin ist ein Range-Filter und wird separat über margin_percent bedient
+        Index("ix_offers_status_margin", "status", "margin_percent"),
+        Index("ix_offers_product_margin", "product_id", "margin_percent"),
+        # Liveness-Re-Check: offene Angebote nach Alter der letzten Prüfung
+        Index("ix_offers_status_last_checked", "status", "last_checked_at"),
+        # Volltextsuche (search_vector) und Trigramm-Suche für Modellnummern (benötigt pg_trgm)
+        Index("ix_offers_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_offers_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        # Umkreissuche: Bounding-Box-Vorfilter (Bereich auf latitude, dann longitude)
+        Index("ix_offers_lat_lon", "latitude", "longitude"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -25,6 +52,10 @@ class Offer(Base):
     margin_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
     geizhals_price: Mapped[float | None] = mapped_column(Float, nullable=True)
 
+    # Aus `location` per Offline-PLZ-Tabelle aufgelöst (services.geo); None = Ort unbekannt
+    latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+
     first_seen_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
@@ -32,6 +63,26 @@ class Offer(Base):
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
 
+    # Near-Duplicate-Erkennung: Reposts desselben Artikels unter neuer URL verweisen aufs Original
+    # MinHash-Signatur (siehe services.dedup); die LSH-Buckets liegen in offer_lsh_buckets
+    minhash: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    duplicate_of_id: Mapped[int | None] = mapped_column(
+        ForeignKey("offers.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+
+    # Deutsch (Stemming) und simple (exakte Tokens) kombiniert; Titel höher gewichtet
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('german', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('german', coalesce(description, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     product = relationship("Product", backref="offers")
 
 
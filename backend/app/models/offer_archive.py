@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class OfferArchive(Base):
+    """Abgeschlossene Angebote außerhalb der heißen Tabellen (siehe services.retention).
+
+    Eine Zeile pro Angebot mit derselben id wie vorher in `offers`; Preis-Historie und
+    Kontakte liegen als JSONB-Arrays daneben (lz4-komprimiert per TOAST, siehe Migration 0005).
+    """
+
+    __tablename__ = "offers_archive"
+    __table_args__ = (
+        # Archiv-Endpoint: neueste zuerst, optional pro Produkt
+        Index("ix_offers_archive_product_id_id", "product_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    # Unique: die Ingestion legt archivierte URLs nicht erneut als neues Angebot an
+    url: Mapped[str] = mapped_column(String(500), nullable=False, unique=True)
+    image_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    seller_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    location: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    description: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    status: Mapped[str] = mapped_column(String(50), nullable=False)
+    margin_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    geizhals_price: Mapped[float | None] = mapped_column(Float, nullable=True)
+    latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Kein Fremdschlüssel: das Original kann selbst archiviert sein
+    duplicate_of_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    price_history: Mapped[list[dict[str, Any]]] = mapped_column(JSONB, nullable=False, deferred=True)
+    contacts: Mapped[list[dict[str, Any]]] = mapped_column(JSONB, nullable=False, deferred=True)
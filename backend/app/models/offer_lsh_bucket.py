@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, ForeignKey, Integer, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class OfferLshBucket(Base):
+    """LSH-Bucket eines Angebots: eine Zeile pro MinHash-Band.
+
+    Kandidaten für die Duplikaterkennung sind Angebote desselben Produkts,
+    die in mindestens einem Band denselben Bucket haben.
+    """
+
+    __tablename__ = "offer_lsh_buckets"
+
+    product_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    band: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    offer_id: Mapped[int] = mapped_column(
+        ForeignKey("offers.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..database import Base
@@ -8,15 +8,24 @@ from ..database import Base
 
 class PriceHistory(Base):
     __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_offer_recorded", "offer_id", "recorded_at"),
+        # recorded_at wächst mit der Einfügereihenfolge: BRIN bleibt winzig und deckt Zeitbereiche ab
+        Index("ix_price_history_recorded_at_brin", "recorded_at", postgresql_using="brin"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     offer_id: Mapped[int] = mapped_column(ForeignKey("offers.id", ondelete="CASCADE"), nullable=False, index=True)
 
+    # Bei verdichteten Zeilen (resolution="1d") ist price der letzte Preis des Tages
     price: Mapped[float] = mapped_column(Float, nullable=False)
+    price_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    price_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    resolution: Mapped[str] = mapped_column(String(10), nullable=False, default="raw", server_default="raw")
+
     recorded_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
 
     offer = relationship("Offer", backref="price_history")
-
-
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..database import Base
@@ -8,6 +8,7 @@ from ..database import Base
 
 class PriceReference(Base):
     __tablename__ = "price_references"
+    __table_args__ = (Index("ix_price_references_product_source", "product_id", "source"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -16,9 +17,11 @@ class PriceReference(Base):
     price: Mapped[float] = mapped_column(Float, nullable=False)
     url: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
+    # updated_at = letzte Preisänderung, checked_at = letzter Abgleich mit der Quelle
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow
     )
+    checked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     product = relationship("Product", backref="price_references")
 
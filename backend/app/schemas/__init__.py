@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ProductBase(BaseModel):
@@ -55,12 +55,114 @@ class OfferCreate(OfferBase):
     pass
 
 
+class OfferBulkCreate(BaseModel):
+    offers: list[OfferCreate] = Field(max_length=5000)
+
+
+class OfferBulkResult(BaseModel):
+    created: int = 0
+    # Bestehende Angebote mit geändertem Titel, Preis, Bild, Verkäufer, Ort oder Beschreibung
+    updated: int = 0
+    unchanged: int = 0
+    # Neue URLs, die als Repost eines bestehenden Angebots erkannt wurden
+    duplicates: int = 0
+    # Bereits archivierte URLs, die nicht erneut angelegt werden
+    archived: int = 0
+    # Außerhalb des Umkreises aus Product.filters (near/radius_km) verworfen
+    out_of_radius: int = 0
+    # Neue oder geänderte Angebote, deren Marge über der Schwelle liegt
+    above_threshold: int = 0
+
+
+class OfferTouch(BaseModel):
+    urls: list[str] = Field(max_length=5000)
+
+
+class OfferTouchResult(BaseModel):
+    touched: int = 0
+
+
+class StaleOfferOut(BaseModel):
+    id: int
+    url: str
+    margin_percent: float | None = None
+    last_checked_at: datetime
+
+
+class OfferLiveness(BaseModel):
+    id: int
+    # False = Anzeige gelöscht oder verkauft (404/410 bzw. Weiterleitung auf die Suche),
+    # None = unklar (5xx, 403, Timeout): nur last_checked_at wird weitergesetzt
+    alive: bool | None
+
+
+class OfferLivenessBatch(BaseModel):
+    results: list[OfferLiveness] = Field(max_length=5000)
+
+
+class OfferLivenessResult(BaseModel):
+    checked: int = 0
+    expired: int = 0
+    inconclusive: int = 0
+
+
+class MarginRecomputeResult(BaseModel):
+    updated: int = 0
+    # Angebote, die die Margen-Schwelle nach oben bzw. unten überschritten haben
+    crossed_above: int = 0
+    crossed_below: int = 0
+
+
 class OfferUpdateStatus(BaseModel):
     status: str
 
 
+class OfferStatusFilter(BaseModel):
+    # Wie bei list_offers; status ist hier der bisherige Status
+    status: str | None = None
+    product_id: int | None = None
+    min_margin: float | None = None
+    max_margin: float | None = None
+    # Nur Angebote, die seit mindestens so vielen Stunden bekannt sind
+    older_than_hours: int | None = Field(None, ge=1)
+
+    @model_validator(mode="after")
+    def _require_criterion(self) -> "OfferStatusFilter":
+        # Ein leerer Filter würde jedes Angebot treffen
+        if all(value is None for value in self.model_dump().values()):
+            raise ValueError("filters need at least one criterion")
+        return self
+
+
+class OfferBulkStatusUpdate(BaseModel):
+    status: str
+    # Entweder eine Auswahl per id oder ein Filter
+    ids: list[int] | None = Field(None, min_length=1, max_length=5000)
+    filters: OfferStatusFilter | None = None
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def _require_ids_or_filters(self) -> "OfferBulkStatusUpdate":
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError("pass either ids or filters")
+        return self
+
+
+class OfferBulkStatusResult(BaseModel):
+    dry_run: bool = False
+    # Getroffene Angebote, die noch nicht im Zielstatus sind
+    matched: int = 0
+    # Aufteilung der getroffenen Angebote nach bisherigem Status
+    by_status: dict[str, int] = Field(default_factory=dict)
+    # Geänderte ids (bei dry_run leer)
+    ids: list[int] = Field(default_factory=list)
+
+
 class OfferOut(OfferBase):
     id: int
+    duplicate_of_id: int | None = None
+    latitude: float | None = None
+    longitude: float | None = None
     first_seen_at: datetime
     last_checked_at: datetime
 
@@ -68,16 +170,34 @@ class OfferOut(OfferBase):
         from_attributes = True
 
 
+class OfferPage(BaseModel):
+    items: list[OfferOut]
+    # Opaker Cursor für die nächste Seite (None = letzte Seite)
+    next_cursor: str | None = None
+
+
 class PriceHistoryOut(BaseModel):
     id: int
     offer_id: int
     price: float
+    price_min: float | None = None
+    price_max: float | None = None
+    samples: int = 1
+    resolution: str = "raw"
     recorded_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class PriceHistoryBucketOut(BaseModel):
+    bucket_start: datetime
+    price_min: float
+    price_max: float
+    price_last: float
+    samples: int
+
+
 class ContactOut(BaseModel):
     id: int
     offer_id: int
@@ -90,6 +210,21 @@ class ContactOut(BaseModel):
         from_attributes = True
 
 
+class ArchivedOfferOut(OfferOut):
+    archived_at: datetime
+
+
+class ArchivedOfferPage(BaseModel):
+    items: list[ArchivedOfferOut]
+    # id des letzten Eintrags als `after` für die nächste Seite (None = letzte Seite)
+    next_cursor: int | None = None
+
+
+class ArchivedOfferDetail(ArchivedOfferOut):
+    price_history: list[PriceHistoryOut]
+    contacts: list[ContactOut]
+
+
 class PriceReferenceOut(BaseModel):
     id: int
     product_id: int
@@ -102,3 +237,22 @@ class PriceReferenceOut(BaseModel):
         from_attributes = True
 
 
+
+
+class ProductStatsOut(BaseModel):
+    product_id: int
+    name: str
+    offers: int
+    avg_margin: float | None = None
+    best_margin: float | None = None
+
+
+class DailyOfferCountOut(BaseModel):
+    day: date
+    offers: int
+
+
+class StatsOut(BaseModel):
+    status_counts: dict[str, int]
+    products: list[ProductStatsOut]
+    daily_new_offers: list[DailyOfferCountOut]
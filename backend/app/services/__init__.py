@@ -0,0 +1,4 @@
+"""Fachlogik, die von API-Endpoints und Celery-Tasks gemeinsam genutzt wird."""
+
+# Registriert die PriceReference-Listener für die Margen-Neuberechnung
+from . import margins  # noqa: F401
@@ -0,0 +1,238 @@
+import hashlib
+import math
+import random
+import re
+import struct
+from collections.abc import Iterable, Iterator, Mapping
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Offer, OfferLshBucket
+from ..schemas import OfferCreate
+
+
+# 32 Permutationen in 8 Bändern à 4 Zeilen: Angebote mit Jaccard 0.8 werden zu ~98 %
+# Kandidaten, mit Jaccard 0.3 nur zu ~6 %
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+# Geschätzte Jaccard-Ähnlichkeit, ab der ein Kandidat als Repost gilt
+DUPLICATE_THRESHOLD = 0.7
+
+# Preisbänder von ~10 % Breite; jedes Angebot bekommt zwei versetzte Bänder,
+# damit 449 € und 441 € auch an einer Bandgrenze ein Merkmal teilen
+PRICE_BAND_BASE = 1.1
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_HASH_MASK = (1 << 32) - 1
+_rng = random.Random(0x5EED)
+# Fester Seed: Signaturen müssen über Prozesse und Deployments hinweg vergleichbar bleiben
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+_SIGNATURE_FORMAT = struct.Struct(f">{MINHASH_PERMUTATIONS}I")
+_BAND_FORMAT = struct.Struct(f">{LSH_ROWS}I")
+
+_TOKEN_RE = re.compile(r"[a-z0-9äöüß]+")
+
+
+def _tokens(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _shingles(tokens: list[str]) -> Iterator[str]:
+    yield from tokens
+    yield from (f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+
+def _image_key(image_url: str | None) -> str | None:
+    # Query-Parameter (Größe, Format) gehören nicht zur Bildidentität
+    return image_url.split("?", 1)[0] if image_url else None
+
+
+def offer_features(offer: OfferCreate) -> set[str]:
+    """Normalisierte Merkmale eines Angebots: Titel, Beschreibung, Verkäufer, Preisband, Bild."""
+    features = {f"t:{shingle}" for shingle in _shingles(_tokens(offer.title))}
+    features.update(f"d:{shingle}" for shingle in _shingles(_tokens(offer.description)))
+    if offer.seller_name:
+        features.add(f"s:{' '.join(_tokens(offer.seller_name))}")
+    band = math.log(max(offer.price, 1.0), PRICE_BAND_BASE)
+    features.update((f"p:{int(band)}", f"q:{int(band + 0.5)}"))
+    if image_key := _image_key(offer.image_url):
+        features.add(f"i:{hashlib.blake2b(image_key.encode(), digest_size=8).hexdigest()}")
+    return features
+
+
+def minhash(features: Iterable[str]) -> tuple[int, ...]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for feature in features
+    ]
+    if not hashes:
+        return (_HASH_MASK,) * MINHASH_PERMUTATIONS
+    return tuple(
+        min((a * value + b) % _MERSENNE_PRIME for value in hashes) & _HASH_MASK
+        for a, b in _PERMUTATIONS
+    )
+
+
+def offer_signature(offer: OfferCreate) -> tuple[int, ...]:
+    return minhash(offer_features(offer))
+
+
+def pack_signature(signature: tuple[int, ...]) -> bytes:
+    return _SIGNATURE_FORMAT.pack(*signature)
+
+
+def unpack_signature(data: bytes) -> tuple[int, ...]:
+    return _SIGNATURE_FORMAT.unpack(data)
+
+
+def signature_buckets(signature: tuple[int, ...]) -> list[int]:
+    """Ein Bucket (vorzeichenbehafteter 64-Bit-Hash) pro LSH-Band."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                _BAND_FORMAT.pack(*signature[band * LSH_ROWS : (band + 1) * LSH_ROWS]),
+                digest_size=8,
+                person=band.to_bytes(2, "big"),
+            ).digest(),
+            "big",
+            signed=True,
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Geschätzte Jaccard-Ähnlichkeit zweier Signaturen."""
+    return sum(x == y for x, y in zip(a, b)) / MINHASH_PERMUTATIONS
+
+
+class MinHashIndex:
+    """LSH-Index über MinHash-Signaturen.
+
+    Eine Abfrage vergleicht nur die Signaturen, die mindestens einen Bucket teilen,
+    nie den gesamten Bestand.
+    """
+
+    def __init__(self) -> None:
+        # Fast alle Buckets enthalten genau ein Angebot: Einzelwerte statt Listen sparen Speicher
+        self._buckets: list[dict[int, int | list[int]]] = [{} for _ in range(LSH_BANDS)]
+        self._signatures: dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def add(self, key: int, signature: tuple[int, ...], buckets: list[int] | None = None) -> None:
+        self._signatures[key] = pack_signature(signature)
+        for band, bucket in zip(self._buckets, buckets or signature_buckets(signature)):
+            existing = band.get(bucket)
+            if existing is None:
+                band[bucket] = key
+            elif isinstance(existing, list):
+                existing.append(key)
+            else:
+                band[bucket] = [existing, key]
+
+    def candidates(self, buckets: list[int]) -> set[int]:
+        keys: set[int] = set()
+        for band, bucket in zip(self._buckets, buckets):
+            existing = band.get(bucket)
+            if isinstance(existing, list):
+                keys.update(existing)
+            elif existing is not None:
+                keys.add(existing)
+        return keys
+
+    def query(
+        self,
+        signature: tuple[int, ...],
+        threshold: float = DUPLICATE_THRESHOLD,
+        buckets: list[int] | None = None,
+    ) -> int | None:
+        """Gib den Schlüssel der ähnlichsten Signatur ab `threshold` zurück."""
+        matches = []
+        for key in self.candidates(buckets or signature_buckets(signature)):
+            score = similarity(signature, unpack_signature(self._signatures[key]))
+            if score >= threshold:
+                matches.append((-score, key))
+        # Bei Gleichstand gewinnt der kleinere Schlüssel, also das ältere Angebot
+        return min(matches)[1] if matches else None
+
+
+async def find_duplicates(
+    session: AsyncSession,
+    offers: Iterable[OfferCreate],
+    signatures: Mapping[str, tuple[int, ...]],
+) -> tuple[dict[str, int], dict[str, str]]:
+    """Ordne neue Angebote (URL) einem Original-Angebot zu.
+
+    Gibt (URL -> id des Originals in der Datenbank, URL -> URL des Originals im selben
+    Batch) zurück. Aus der Datenbank kommen nur Angebote desselben Produkts, die einen
+    LSH-Bucket teilen (Primärschlüssel-Lookup); die Ähnlichkeit wird im Speicher geschätzt.
+    Ein Original aus der Datenbank hat Vorrang vor einem aus dem Batch.
+    """
+    offers = list(offers)
+    if not offers:
+        return {}, {}
+
+    buckets = {offer.url: signature_buckets(signatures[offer.url]) for offer in offers}
+    keys = {
+        (offer.product_id, band, bucket)
+        for offer in offers
+        for band, bucket in enumerate(buckets[offer.url])
+    }
+    stmt = (
+        select(Offer.id, Offer.product_id, Offer.minhash)
+        .join(OfferLshBucket, OfferLshBucket.offer_id == Offer.id)
+        .where(
+            tuple_(OfferLshBucket.product_id, OfferLshBucket.band, OfferLshBucket.bucket).in_(keys),
+            Offer.duplicate_of_id.is_(None),
+        )
+        .distinct()
+    )
+    indexes: dict[int, MinHashIndex] = {}
+    for offer_id, product_id, packed in (await session.execute(stmt)).all():
+        indexes.setdefault(product_id, MinHashIndex()).add(offer_id, unpack_signature(packed))
+
+    # Originale dieses Batches, Schlüssel = Position in `batch_urls` (früheres Angebot gewinnt)
+    batch_indexes: dict[int, MinHashIndex] = {}
+    batch_urls: list[str] = []
+    duplicates: dict[str, int] = {}
+    batch_duplicates: dict[str, str] = {}
+    for offer in offers:
+        signature, offer_buckets = signatures[offer.url], buckets[offer.url]
+        if index := indexes.get(offer.product_id):
+            original_id = index.query(signature, buckets=offer_buckets)
+            if original_id is not None:
+                duplicates[offer.url] = original_id
+                continue
+        batch_index = batch_indexes.setdefault(offer.product_id, MinHashIndex())
+        position = batch_index.query(signature, buckets=offer_buckets)
+        if position is not None:
+            batch_duplicates[offer.url] = batch_urls[position]
+            continue
+        batch_index.add(len(batch_urls), signature, offer_buckets)
+        batch_urls.append(offer.url)
+    return duplicates, batch_duplicates
+
+
+async def store_buckets(
+    session: AsyncSession,
+    offers: Iterable[tuple[int, int, tuple[int, ...]]],
+) -> None:
+    """Ersetze die LSH-Buckets für (offer_id, product_id, Signatur)."""
+    rows = [
+        {"product_id": product_id, "band": band, "bucket": bucket, "offer_id": offer_id}
+        for offer_id, product_id, signature in offers
+        for band, bucket in enumerate(signature_buckets(signature))
+    ]
+    if not rows:
+        return
+    offer_ids = {row["offer_id"] for row in rows}
+    await session.execute(delete(OfferLshBucket).where(OfferLshBucket.offer_id.in_(offer_ids)))
+    await session.execute(insert(OfferLshBucket), rows)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from typing import Any
+
+import asyncpg
+import structlog
+from sqlalchemy import make_url
+
+from ..config import get_settings
+
+
+logger = structlog.get_logger(__name__)
+settings = get_settings()
+
+# Gefüllt vom Trigger `notify_offer_event` auf `offers` (Migration 0004)
+OFFER_EVENTS_CHANNEL = "offer_events"
+
+# Puffer pro SSE-Client; langsame Clients verlieren Events statt den Broker zu blockieren
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Wartezeiten zwischen Reconnect-Versuchen, der letzte Wert wiederholt sich
+RECONNECT_DELAYS_SECONDS = (1, 2, 5, 10, 30)
+
+
+class OfferEventBroker:
+    """Eine LISTEN-Connection pro Prozess, die Offer-Events an alle Stream-Clients verteilt.
+
+    Bricht die Connection ab (Postgres-Neustart, Failover), verbindet sich der Broker im
+    Hintergrund neu und lauscht wieder; Events aus der Lücke gehen verloren.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: set[asyncio.Queue[dict[str, Any]]] = set()
+        self._connection: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+
+    async def subscribe(self) -> asyncio.Queue[dict[str, Any]]:
+        await self._ensure_listening()
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[dict[str, Any]]) -> None:
+        self._subscribers.discard(queue)
+
+    async def close(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        # Vor dem Schließen lösen, damit der Termination-Listener keinen Reconnect startet
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+    def _is_listening(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def _ensure_listening(self) -> None:
+        async with self._lock:
+            if not self._is_listening():
+                await self._connect()
+
+    async def _connect(self) -> None:
+        if not settings.database_url:
+            raise RuntimeError("Database not configured. Please set DATABASE_URL in your .env file.")
+        dsn = make_url(settings.database_url).set(drivername="postgresql")
+        connection = await asyncpg.connect(dsn.render_as_string(hide_password=False))
+        connection.add_termination_listener(self._on_terminate)
+        await connection.add_listener(OFFER_EVENTS_CHANNEL, self._on_notify)
+        self._connection = connection
+        logger.info("offer_events_listening", channel=OFFER_EVENTS_CHANNEL)
+
+    def _on_terminate(self, connection: asyncpg.Connection) -> None:
+        if connection is not self._connection:
+            return
+        logger.warning("offer_events_connection_lost", subscribers=len(self._subscribers))
+        # Ohne Clients verbindet erst das nächste subscribe() neu
+        if self._subscribers and (self._reconnect_task is None or self._reconnect_task.done()):
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        attempt = 0
+        while True:
+            await asyncio.sleep(RECONNECT_DELAYS_SECONDS[min(attempt, len(RECONNECT_DELAYS_SECONDS) - 1)])
+            attempt += 1
+            try:
+                async with self._lock:
+                    if self._is_listening():
+                        return
+                    await self._connect()
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("offer_events_reconnect_failed", attempt=attempt, error=str(e))
+                continue
+            logger.info("offer_events_reconnected", attempts=attempt)
+            return
+
+    def _on_notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        event = json.loads(payload)
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("offer_event_dropped", offer_id=event.get("id"))
+
+
+offer_events = OfferEventBroker()
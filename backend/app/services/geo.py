@@ -0,0 +1,162 @@
+import csv
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import structlog
+from sqlalchemy import ColumnElement, and_, func
+
+from ..config import get_settings
+
+
+logger = structlog.get_logger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 50.0
+# Unterschiedliche Ortsangaben; Kleinanzeigen liefert überwiegend "PLZ Ort Stadtteil"
+GEOCODE_CACHE_SIZE = 50_000
+
+_POSTCODE_RE = re.compile(r"\b(\d{5})\b")
+_COORDINATES_RE = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+Point = tuple[float, float]
+
+
+@dataclass(frozen=True, slots=True)
+class PostcodeTable:
+    """Offline-Geocoding: Postleitzahl bzw. Ortsname -> (Breite, Länge)."""
+
+    postcodes: dict[str, Point]
+    cities: dict[str, Point]
+
+
+def _normalize(name: str) -> str:
+    return " ".join(_NON_WORD_RE.sub(" ", name.lower()).split())
+
+
+def load_postcode_table(path: str) -> PostcodeTable:
+    """Lade den GeoNames-Postleitzahlen-Export (DE.txt, tab-getrennt, CC BY 4.0).
+
+    Spalten: Land, PLZ, Ort, ... , Breite (10.), Länge (11.). Mehrere Zeilen pro PLZ bzw.
+    Ort werden gemittelt; Orte zusätzlich ohne Klammerzusatz ("Halle (Saale)" -> "halle").
+    """
+    postcode_points: dict[str, list[Point]] = defaultdict(list)
+    city_points: dict[str, list[Point]] = defaultdict(list)
+    with open(path, encoding="utf-8", newline="") as file:
+        for row in csv.reader(file, delimiter="\t"):
+            point = (float(row[9]), float(row[10]))
+            postcode_points[row[1]].append(point)
+            city_points[_normalize(row[2])].append(point)
+            short_name = _normalize(re.split(r"[(,/]", row[2], maxsplit=1)[0])
+            if short_name:
+                city_points[short_name].append(point)
+
+    def mean(points: list[Point]) -> Point:
+        return (sum(lat for lat, _ in points) / len(points), sum(lon for _, lon in points) / len(points))
+
+    return PostcodeTable(
+        postcodes={postcode: mean(points) for postcode, points in postcode_points.items()},
+        cities={city: mean(points) for city, points in city_points.items()},
+    )
+
+
+@lru_cache(maxsize=1)
+def postcode_table() -> PostcodeTable | None:
+    """Einmal pro Prozess geladen; ohne Datei ist Geocoding deaktiviert."""
+    path = get_settings().geo_postcodes_path
+    try:
+        table = load_postcode_table(path)
+    except FileNotFoundError:
+        logger.warning("geocoding_disabled", reason="postcode table not found", path=path)
+        return None
+    logger.info("postcode_table_loaded", postcodes=len(table.postcodes), cities=len(table.cities))
+    return table
+
+
+@lru_cache(maxsize=GEOCODE_CACHE_SIZE)
+def geocode(location: str) -> Point | None:
+    """Koordinaten für eine Freitext-Ortsangabe: zuerst die PLZ, sonst der längste bekannte Ortsname."""
+    table = postcode_table()
+    if table is None:
+        return None
+    if (match := _POSTCODE_RE.search(location)) and (point := table.postcodes.get(match.group(1))):
+        return point
+    words = _normalize(_POSTCODE_RE.sub(" ", location)).split()
+    for end in range(len(words), 0, -1):
+        if point := table.cities.get(" ".join(words[:end])):
+            return point
+    return None
+
+
+def resolve_near(near: str) -> Point | None:
+    """`near=` als "Breite,Länge", PLZ oder Ortsname."""
+    if match := _COORDINATES_RE.match(near):
+        return float(match.group(1)), float(match.group(2))
+    return geocode(near)
+
+
+def offer_coordinates(location: str | None) -> dict[str, float | None]:
+    """`latitude`/`longitude` für einen Offer-Datensatz (None, wenn der Ort unbekannt ist)."""
+    point = geocode(location) if location else None
+    return {"latitude": point[0] if point else None, "longitude": point[1] if point else None}
+
+
+def radius_filter(filters: dict[str, Any]) -> tuple[Point, float] | None:
+    """Umkreis aus `Product.filters` (`near`, optional `radius_km`), None ohne bzw. bei unbekanntem Ort."""
+    near = filters.get("near")
+    if not near:
+        return None
+    center = resolve_near(str(near))
+    if center is None:
+        logger.warning("product_near_unknown", near=near)
+        return None
+    return center, float(filters.get("radius_km") or DEFAULT_RADIUS_KM)
+
+
+def haversine_km(center: Point, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Großkreisentfernungen von `center` zu allen Punkten, vektorisiert."""
+    lat1, lon1 = np.radians(center[0]), np.radians(center[1])
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def within_radius(center: Point, radius_km: float, points: list[Point]) -> np.ndarray:
+    """Bool-Maske: welche Punkte liegen im Umkreis."""
+    if not points:
+        return np.zeros(0, dtype=bool)
+    coordinates = np.asarray(points, dtype=np.float64)
+    return haversine_km(center, coordinates[:, 0], coordinates[:, 1]) <= radius_km
+
+
+def bounding_box(center: Point, radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) um den Umkreis; Vorfilter über den Index."""
+    lat, lon = center
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Längengrade werden zu den Polen hin schmaler
+    delta_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * max(math.cos(math.radians(lat)), 1e-6)))
+    return lat - delta_lat, lat + delta_lat, lon - delta_lon, lon + delta_lon
+
+
+def radius_condition(
+    center: Point,
+    radius_km: float,
+    latitude: ColumnElement[float],
+    longitude: ColumnElement[float],
+) -> ColumnElement[bool]:
+    """Bounding-Box (Index auf latitude, longitude) plus exakte Haversine-Distanz in SQL."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(center, radius_km)
+    lat1, lon1 = math.radians(center[0]), math.radians(center[1])
+    a = func.power(func.sin((func.radians(latitude) - lat1) / 2), 2) + math.cos(lat1) * func.cos(
+        func.radians(latitude)
+    ) * func.power(func.sin((func.radians(longitude) - lon1) / 2), 2)
+    return and_(
+        latitude.between(min_lat, max_lat),
+        longitude.between(min_lon, max_lon),
+        2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a))) <= radius_km,
+    )
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import structlog
+from sqlalchemy import Connection, text
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Rohpunkte vor dem Stichtag werden pro Angebot und Tag zu einer Zeile (min/max/letzter Preis) verdichtet
+_COMPACT_SQL = text(
+    """
+    WITH raw AS (
+        DELETE FROM price_history
+        WHERE resolution = 'raw' AND recorded_at < :cutoff
+        RETURNING offer_id, price, recorded_at
+    ), daily AS (
+        SELECT
+            offer_id,
+            date_trunc('day', recorded_at) AS day,
+            min(price) AS price_min,
+            max(price) AS price_max,
+            (array_agg(price ORDER BY recorded_at DESC))[1] AS price_last,
+            count(*) AS samples
+        FROM raw
+        GROUP BY offer_id, date_trunc('day', recorded_at)
+    )
+    INSERT INTO price_history (offer_id, price, price_min, price_max, samples, resolution, recorded_at)
+    SELECT offer_id, price_last, price_min, price_max, samples, '1d', day
+    FROM daily
+    """
+)
+
+
+def compact_price_history(connection: Connection, keep_raw_days: int) -> int:
+    """Verdichte Rohpunkte älter als `keep_raw_days` (auf Tagesgrenze abgerundet) zu Tageszeilen.
+
+    Gibt die Anzahl der erzeugten Tageszeilen zurück.
+    """
+    cutoff = (datetime.utcnow() - timedelta(days=keep_raw_days)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    rows = connection.execute(_COMPACT_SQL, {"cutoff": cutoff}).rowcount
+    logger.info("price_history_compacted", cutoff=cutoff.isoformat(), daily_rows=rows)
+    return rows
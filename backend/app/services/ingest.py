@@ -0,0 +1,220 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import Row, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..models import Offer, OfferArchive, PriceHistory, Product
+from ..schemas import OfferBulkResult, OfferCreate, OfferTouchResult
+from .dedup import find_duplicates, offer_signature, pack_signature, store_buckets
+from .geo import Point, geocode, radius_filter, within_radius
+from .margins import recompute_margins
+
+
+# Ein INSERT pro Chunk: 500 Zeilen × 17 Spalten (OfferCreate plus minhash, duplicate_of_id,
+# Koordinaten, Zeitstempel) = 8500 Parameter; das Limit von asyncpg liegt bei 32767 pro
+# Statement, also bei gut 1900 Zeilen
+BULK_CHUNK_SIZE = 500
+
+# Felder, die bei einem erneuten Fund überschrieben werden. Status und Triage bleiben unangetastet.
+REFRESHED_FIELDS = ("title", "price", "image_url", "seller_name", "location", "description")
+
+
+async def upsert_offers(session: AsyncSession, offers: Sequence[OfferCreate]) -> OfferBulkResult:
+    """Schreibe gescrapte Angebote per `INSERT ... ON CONFLICT (url) DO UPDATE`.
+
+    `updated` zählt Angebote, bei denen sich eines der `REFRESHED_FIELDS` geändert hat.
+    Für neue Angebote und bei Preisänderungen wird ein `PriceHistory`-Eintrag angelegt
+    und die Marge der betroffenen Produkte neu berechnet; `above_threshold` zählt davon die
+    Angebote über der Margen-Schwelle (Ertragssignal für den Crawl-Scheduler). Neue URLs, deren MinHash-Signatur einem
+    bestehenden Angebot entspricht, werden als `duplicate` mit Verweis aufs Original angelegt.
+    Angebote außerhalb des Umkreises aus `Product.filters` (`near`, `radius_km`) werden verworfen.
+    """
+    result = OfferBulkResult()
+    now = datetime.utcnow()
+    changed_offers: dict[int, int] = {}
+
+    # ON CONFLICT darf eine Zeile nur einmal pro Statement treffen: letzter Eintrag pro URL gewinnt
+    unique_offers = list({offer.url: offer for offer in offers}.values())
+
+    points = {offer.url: geocode(offer.location) if offer.location else None for offer in unique_offers}
+    unique_offers, result.out_of_radius = await _filter_by_radius(session, unique_offers, points)
+
+    for start in range(0, len(unique_offers), BULK_CHUNK_SIZE):
+        chunk = unique_offers[start : start + BULK_CHUNK_SIZE]
+        changed_offers.update(await _upsert_chunk(session, chunk, points, now, result))
+
+    if changed_offers:
+        changed_product_ids = set(changed_offers.values())
+        await session.run_sync(
+            lambda sync_session: recompute_margins(sync_session.connection(), changed_product_ids)
+        )
+        result.above_threshold = await session.scalar(
+            select(func.count()).where(
+                Offer.id.in_(list(changed_offers)),
+                Offer.margin_percent >= get_settings().margin_threshold_percent,
+            )
+        )
+
+    await session.commit()
+    return result
+
+
+async def _filter_by_radius(
+    session: AsyncSession,
+    offers: list[OfferCreate],
+    points: dict[str, Point | None],
+) -> tuple[list[OfferCreate], int]:
+    """Verwirf Angebote außerhalb des Produkt-Umkreises; vektorisiert pro Produkt.
+
+    Angebote ohne auflösbaren Ort bleiben erhalten. Gibt (behaltene Angebote, Anzahl verworfener) zurück.
+    """
+    rows = await session.execute(
+        select(Product.id, Product.filters).where(
+            Product.id.in_({offer.product_id for offer in offers}), Product.filters.has_key("near")
+        )
+    )
+    radii = {product_id: radius for product_id, filters in rows if (radius := radius_filter(filters))}
+    if not radii:
+        return offers, 0
+
+    located: dict[int, list[str]] = defaultdict(list)
+    for offer in offers:
+        if offer.product_id in radii and points[offer.url] is not None:
+            located[offer.product_id].append(offer.url)
+
+    rejected = set()
+    for product_id, urls in located.items():
+        center, radius_km = radii[product_id]
+        inside = within_radius(center, radius_km, [points[url] for url in urls])
+        rejected.update(url for url, keep in zip(urls, inside) if not keep)
+    return [offer for offer in offers if offer.url not in rejected], len(rejected)
+
+
+async def _upsert_chunk(
+    session: AsyncSession,
+    chunk: Sequence[OfferCreate],
+    points: dict[str, Point | None],
+    now: datetime,
+    result: OfferBulkResult,
+) -> dict[int, int]:
+    """Upserte einen Chunk und gib neue oder geänderte Angebote als {offer_id: product_id} zurück."""
+    urls = [offer.url for offer in chunk]
+
+    # Archivierte Angebote sind abgeschlossen und kommen nicht als neue zurück
+    archived = set(await session.scalars(select(OfferArchive.url).where(OfferArchive.url.in_(urls))))
+    if archived:
+        result.archived += len(archived)
+        chunk = [offer for offer in chunk if offer.url not in archived]
+        if not chunk:
+            return {}
+        urls = [offer.url for offer in chunk]
+
+    # Bisherige Preise sperren, damit parallele Ingests keine Preisänderung verschlucken
+    previous = (
+        await session.execute(
+            select(Offer.url, Offer.minhash, *(getattr(Offer, field) for field in REFRESHED_FIELDS))
+            .where(Offer.url.in_(urls))
+            .with_for_update()
+        )
+    ).all()
+    previous_prices: dict[str, float] = {row.url: row.price for row in previous}
+    previous_minhashes: dict[str, bytes | None] = {row.url: row.minhash for row in previous}
+    previous_fields = {row.url: tuple(getattr(row, field) for field in REFRESHED_FIELDS) for row in previous}
+    scraped_fields = {offer.url: tuple(getattr(offer, field) for field in REFRESHED_FIELDS) for offer in chunk}
+
+    # Reposts unter neuer URL erkennen, bevor sie als aktives Angebot angelegt werden
+    signatures = {offer.url: offer_signature(offer) for offer in chunk}
+    duplicates, batch_duplicates = await find_duplicates(
+        session, (offer for offer in chunk if offer.url not in previous_prices), signatures
+    )
+
+    def row(offer: OfferCreate, duplicate_of_id: int | None) -> dict:
+        # Multi-VALUES verlangt dieselben Schlüssel in jeder Zeile, daher duplicate_of_id immer setzen
+        values = {
+            **offer.model_dump(),
+            "minhash": pack_signature(signatures[offer.url]),
+            "duplicate_of_id": duplicate_of_id,
+            "latitude": points[offer.url][0] if points[offer.url] else None,
+            "longitude": points[offer.url][1] if points[offer.url] else None,
+            "first_seen_at": now,
+            "last_checked_at": now,
+        }
+        if duplicate_of_id is not None:
+            values["status"] = "duplicate"
+        return values
+
+    upserted = await _execute_upsert(
+        session,
+        [row(offer, duplicates.get(offer.url)) for offer in chunk if offer.url not in batch_duplicates],
+    )
+    # Reposts innerhalb des Batches brauchen die id ihres Originals, also erst danach einfügen
+    if batch_duplicates:
+        ids = {url: offer_id for offer_id, _, url, _, _ in upserted}
+        duplicates.update({url: ids[original_url] for url, original_url in batch_duplicates.items()})
+        upserted += await _execute_upsert(
+            session, [row(offer, duplicates[offer.url]) for offer in chunk if offer.url in batch_duplicates]
+        )
+
+    history = []
+    changed_offers = {}
+    changed_signatures = []
+    for offer_id, product_id, url, price, duplicate_of_id in upserted:
+        if url in duplicates:
+            result.duplicates += 1
+            continue
+        # Nur Originale landen in den LSH-Buckets; Duplikate verweisen bereits auf eines
+        if duplicate_of_id is None and previous_minhashes.get(url) != pack_signature(signatures[url]):
+            changed_signatures.append((offer_id, product_id, signatures[url]))
+        if url not in previous_prices:
+            result.created += 1
+        elif previous_fields[url] != scraped_fields[url]:
+            result.updated += 1
+        else:
+            result.unchanged += 1
+        # Historie und Margen hängen nur am Preis
+        if url in previous_prices and previous_prices[url] == price:
+            continue
+        history.append({"offer_id": offer_id, "price": price, "recorded_at": now})
+        changed_offers[offer_id] = product_id
+
+    if history:
+        await session.execute(insert(PriceHistory), history)
+    await store_buckets(session, changed_signatures)
+    return changed_offers
+
+
+async def _execute_upsert(session: AsyncSession, values: list[dict]) -> list[Row]:
+    """`INSERT ... ON CONFLICT (url) DO UPDATE`; gibt (id, product_id, url, price, duplicate_of_id) zurück."""
+    stmt = pg_insert(Offer).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Offer.url],
+        set_={
+            **{field: stmt.excluded[field] for field in REFRESHED_FIELDS},
+            "margin_percent": func.coalesce(stmt.excluded.margin_percent, Offer.margin_percent),
+            "geizhals_price": func.coalesce(stmt.excluded.geizhals_price, Offer.geizhals_price),
+            "minhash": stmt.excluded.minhash,
+            # Unbekannter Ort im neuen Fund überschreibt keine bekannten Koordinaten
+            "latitude": func.coalesce(stmt.excluded.latitude, Offer.latitude),
+            "longitude": func.coalesce(stmt.excluded.longitude, Offer.longitude),
+            "last_checked_at": stmt.excluded.last_checked_at,
+        },
+    ).returning(Offer.id, Offer.product_id, Offer.url, Offer.price, Offer.duplicate_of_id)
+    return list((await session.execute(stmt)).all())
+
+
+async def touch_offers(session: AsyncSession, urls: Sequence[str]) -> OfferTouchResult:
+    """Setze `last_checked_at` für unverändert wiedergefundene Angebote in einem UPDATE."""
+    if not urls:
+        return OfferTouchResult()
+    result = await session.execute(
+        update(Offer)
+        .where(Offer.url.in_(set(urls)))
+        .values(last_checked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return OfferTouchResult(touched=result.rowcount)
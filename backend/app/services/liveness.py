@@ -0,0 +1,66 @@
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from sqlalchemy import Boolean, Integer, case, column, func, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Offer
+from ..models.offer import CLOSED_OFFER_STATUSES
+from ..schemas import OfferLiveness, OfferLivenessResult, StaleOfferOut
+
+
+async def select_stale_offers(
+    session: AsyncSession,
+    older_than: timedelta,
+    limit: int,
+) -> list[StaleOfferOut]:
+    """Offene Angebote, deren letzte Prüfung älter als `older_than` ist, die mit hoher Marge zuerst."""
+    stmt = (
+        select(Offer.id, Offer.url, Offer.margin_percent, Offer.last_checked_at)
+        .where(
+            Offer.status.notin_(CLOSED_OFFER_STATUSES),
+            Offer.last_checked_at < datetime.utcnow() - older_than,
+        )
+        .order_by(Offer.margin_percent.desc().nulls_last(), Offer.last_checked_at)
+        .limit(limit)
+    )
+    return [StaleOfferOut.model_validate(row._mapping) for row in await session.execute(stmt)]
+
+
+async def apply_liveness(
+    session: AsyncSession,
+    results: Sequence[OfferLiveness],
+) -> OfferLivenessResult:
+    """Schreibe Re-Check-Ergebnisse in einem `UPDATE ... FROM (VALUES ...)`.
+
+    Nicht mehr erreichbare Angebote werden `expired`; alle geprüften bekommen ein neues
+    `last_checked_at`, auch unklare (`alive=None`), damit sie nicht jeden Batch erneut
+    belegen. Zwischenzeitlich geschlossene Angebote bleiben unangetastet.
+    """
+    if not results:
+        return OfferLivenessResult()
+
+    checked = values(column("id", Integer), column("alive", Boolean), name="checked").data(
+        [(result.id, result.alive) for result in {result.id: result for result in results}.values()]
+    )
+    stmt = (
+        update(Offer)
+        .where(Offer.id == checked.c.id, Offer.status.notin_(CLOSED_OFFER_STATUSES))
+        .values(
+            status=case((checked.c.alive.is_(False), "expired"), else_=Offer.status),
+            last_checked_at=datetime.utcnow(),
+        )
+        .returning(Offer.status, checked.c.alive)
+        .cte("checked_offers")
+    )
+    count, expired, inconclusive = (
+        await session.execute(
+            select(
+                func.count(),
+                func.count().filter(stmt.c.status == "expired"),
+                func.count().filter(stmt.c.alive.is_(None)),
+            )
+        )
+    ).one()
+    await session.commit()
+    return OfferLivenessResult(checked=count, expired=expired, inconclusive=inconclusive)
@@ -0,0 +1,86 @@
+from collections.abc import Iterable
+
+import structlog
+from sqlalchemy import Connection, and_, event, func, or_, select, update
+
+from ..config import get_settings
+from ..models import Offer, PriceReference
+from ..models.offer import CLOSED_OFFER_STATUSES
+from ..schemas import MarginRecomputeResult
+
+
+logger = structlog.get_logger(__name__)
+
+
+def recompute_margins(
+    connection: Connection,
+    product_ids: Iterable[int],
+    threshold: float | None = None,
+) -> MarginRecomputeResult:
+    """Berechne die Margen aller offenen Angebote der Produkte in einem `UPDATE ... FROM`.
+
+    Referenz ist der günstigste `PriceReference`-Preis je Produkt,
+    Marge = (Referenz - Angebotspreis) / Referenz * 100.
+    Zeilen, deren Werte sich nicht ändern, werden nicht neu geschrieben.
+    """
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return MarginRecomputeResult()
+    if threshold is None:
+        threshold = get_settings().margin_threshold_percent
+
+    offers = Offer.__table__
+    # Self-Join, damit RETURNING die Marge vor dem Update liefern kann
+    previous = offers.alias("previous")
+    reference = (
+        select(PriceReference.product_id, func.min(PriceReference.price).label("price"))
+        .where(PriceReference.product_id.in_(product_ids), PriceReference.price > 0)
+        .group_by(PriceReference.product_id)
+        .subquery("reference")
+    )
+    margin = (reference.c.price - offers.c.price) / reference.c.price * 100
+
+    updated = (
+        update(offers)
+        .where(
+            offers.c.product_id == reference.c.product_id,
+            previous.c.id == offers.c.id,
+            offers.c.status.notin_(CLOSED_OFFER_STATUSES),
+            or_(
+                offers.c.geizhals_price.is_distinct_from(reference.c.price),
+                offers.c.margin_percent.is_distinct_from(margin),
+            ),
+        )
+        .values(geizhals_price=reference.c.price, margin_percent=margin)
+        .returning(
+            previous.c.margin_percent.label("previous_margin"),
+            offers.c.margin_percent.label("margin"),
+        )
+        .cte("updated")
+    )
+    stmt = select(
+        func.count(),
+        func.count().filter(
+            and_(
+                updated.c.margin >= threshold,
+                or_(updated.c.previous_margin.is_(None), updated.c.previous_margin < threshold),
+            )
+        ),
+        func.count().filter(
+            and_(updated.c.margin < threshold, updated.c.previous_margin >= threshold)
+        ),
+    )
+
+    count, crossed_above, crossed_below = connection.execute(stmt).one()
+    result = MarginRecomputeResult(
+        updated=count, crossed_above=crossed_above, crossed_below=crossed_below
+    )
+    logger.info("margins_recomputed", product_ids=product_ids, threshold=threshold, **result.model_dump())
+    return result
+
+
+@event.listens_for(PriceReference, "after_insert")
+@event.listens_for(PriceReference, "after_update")
+def _price_reference_changed(mapper, connection: Connection, target: PriceReference) -> None:
+    # Läuft innerhalb des Flushs auf derselben Connection/Transaktion (sync und async Sessions)
+    recompute_margins(connection, [target.product_id])
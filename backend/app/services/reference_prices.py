@@ -0,0 +1,406 @@
+import asyncio
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+from urllib.parse import quote
+
+import httpx
+import structlog
+from sqlalchemy import bindparam, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import get_optional_redis
+from ..config import get_settings
+from ..database import new_session
+from ..metrics import REFERENCE_PRICE_FETCHES, REFERENCE_PRICE_LOOKUPS
+from ..models import PriceReference, Product
+from .margins import recompute_margins
+from .versions import OFFERS_VERSION_KEY, bump_version
+
+
+logger = structlog.get_logger(__name__)
+settings = get_settings()
+
+# TTL = Zeit seit der letzten Preisänderung × Faktor: stabile Preise werden seltener abgefragt
+TTL_STABILITY_FACTOR = 0.5
+
+CacheKey = tuple[int, str]
+
+
+@dataclass(frozen=True)
+class PriceQuote:
+    price: float
+    url: str | None = None
+
+
+class PriceSource(Protocol):
+    """Upstream für Referenzpreise; `fetch` bekommt einen ganzen Batch {product_id: Suchbegriff}."""
+
+    name: str
+
+    async def fetch(self, queries: Mapping[int, str]) -> dict[int, PriceQuote]: ...
+
+
+class HttpPriceSource:
+    """Fragt pro Produkt ein URL-Template ab, das `{"price": ..., "url": ...}` liefert."""
+
+    def __init__(self, name: str, url_template: str, concurrency: int = 4, timeout: float = 10.0) -> None:
+        self.name = name
+        self.url_template = url_template
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def fetch(self, queries: Mapping[int, str]) -> dict[int, PriceQuote]:
+        results = await asyncio.gather(*(self._fetch_one(query) for query in queries.values()))
+        return {product_id: quote for product_id, quote in zip(queries, results) if quote}
+
+    async def _fetch_one(self, query: str) -> PriceQuote | None:
+        async with self._semaphore:
+            try:
+                response = await self._client.get(self.url_template.format(query=quote(query)))
+                response.raise_for_status()
+                data = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("reference_price_fetch_failed", source=self.name, query=query, error=str(e))
+                return None
+        return PriceQuote(price=float(data["price"]), url=data.get("url")) if data.get("price") else None
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class StaticPriceSource:
+    """Lokale Fake-Quelle mit festen Preisen und optionaler Latenz (Entwicklung, Benchmarks)."""
+
+    def __init__(self, name: str, prices: Mapping[int, float], latency: float = 0.0) -> None:
+        self.name = name
+        self.prices = dict(prices)
+        self.latency = latency
+        self.calls = 0
+
+    async def fetch(self, queries: Mapping[int, str]) -> dict[int, PriceQuote]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return {
+            product_id: PriceQuote(self.prices[product_id])
+            for product_id in queries
+            if product_id in self.prices
+        }
+
+
+@dataclass
+class CachedPrice:
+    price: float | None
+    updated_at: datetime
+    checked_at: datetime
+    expires_at: datetime
+    url: str | None = None
+
+
+def reference_ttl(updated_at: datetime, checked_at: datetime, min_ttl: float, max_ttl: float) -> timedelta:
+    stable_for = (checked_at - updated_at).total_seconds()
+    return timedelta(seconds=min(max(stable_for * TTL_STABILITY_FACTOR, min_ttl), max_ttl))
+
+
+class ReferencePriceService:
+    """Hält Referenzpreise pro (product_id, Quelle) frisch, ohne die Quellen pro Angebot abzufragen.
+
+    - In-Process-Cache mit TTL abhängig von `updated_at` (Zeit seit der letzten Preisänderung)
+    - gleichzeitige Anfragen für denselben Schlüssel teilen sich einen Upstream-Abruf
+    - Fehlschlüssel werden pro Quelle gebündelt abgefragt, bald ablaufende Einträge
+      im Hintergrund gesammelt erneuert
+    - Ergebnisse landen in `price_references`; Preisänderungen lösen eine Margen-Neuberechnung aus
+
+    Ohne `session_factory` arbeitet der Service nur im Speicher (z.B. mit `StaticPriceSource`).
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[PriceSource],
+        session_factory: Callable[[], AsyncSession] | None = None,
+        min_ttl: float = settings.reference_price_min_ttl,
+        max_ttl: float = settings.reference_price_max_ttl,
+        refresh_ahead: float = settings.reference_price_refresh_ahead,
+    ) -> None:
+        self.sources = {source.name: source for source in sources}
+        self.session_factory = session_factory
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.refresh_ahead = timedelta(seconds=refresh_ahead)
+        self._cache: dict[CacheKey, CachedPrice] = {}
+        self._inflight: dict[CacheKey, asyncio.Future[CachedPrice | None]] = {}
+        self._refresh_task: asyncio.Task | None = None
+        # Referenzen auf laufende Abrufe, damit der Event-Loop sie nicht vorzeitig verwirft
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get(self, product_id: int, source: str) -> float | None:
+        return (await self.get_many([product_id], [source])).get((product_id, source))
+
+    async def get_many(
+        self,
+        product_ids: Iterable[int],
+        sources: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> dict[CacheKey, float | None]:
+        """Referenzpreise für alle Kombinationen aus Produkten und Quellen.
+
+        Mit `timeout` wird höchstens so lange auf Abrufe gewartet; für noch offene Schlüssel
+        kommt der zuletzt bekannte (ggf. abgelaufene) Preis. Die Abrufe laufen weiter.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        now = datetime.utcnow()
+        sources = list(sources or self.sources)
+        prices: dict[CacheKey, float | None] = {}
+        waiting: dict[CacheKey, asyncio.Future[CachedPrice | None]] = {}
+        misses: list[CacheKey] = []
+
+        for key in {(product_id, source) for product_id in product_ids for source in sources}:
+            entry = self._cache.get(key)
+            if entry and entry.expires_at > now:
+                REFERENCE_PRICE_LOOKUPS.labels(key[1], "hit").inc()
+                prices[key] = entry.price
+            elif key in self._inflight:
+                REFERENCE_PRICE_LOOKUPS.labels(key[1], "coalesced").inc()
+                waiting[key] = self._inflight[key]
+            else:
+                REFERENCE_PRICE_LOOKUPS.labels(key[1], "miss").inc()
+                misses.append(key)
+
+        if misses:
+            waiting.update(self._start_fetch(misses))
+        timed_out = 0
+        for key, future in waiting.items():
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            try:
+                entry = await asyncio.wait_for(asyncio.shield(future), remaining)
+            except asyncio.TimeoutError:
+                timed_out += 1
+                entry = self._cache.get(key)
+            except Exception:
+                # Quelle nicht erreichbar: lieber den abgelaufenen Wert als gar keinen
+                entry = self._cache.get(key)
+            prices[key] = entry.price if entry else None
+        if timed_out:
+            logger.warning("reference_prices_timed_out", keys=timed_out, timeout=timeout)
+        return prices
+
+    def _start_fetch(self, keys: list[CacheKey]) -> dict[CacheKey, asyncio.Future[CachedPrice | None]]:
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in keys}
+        self._inflight.update(futures)
+        task = asyncio.create_task(self._fetch(futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return futures
+
+    async def _fetch(self, futures: dict[CacheKey, asyncio.Future[CachedPrice | None]]) -> None:
+        try:
+            entries = await self._load_or_fetch(list(futures))
+            for key, future in futures.items():
+                future.set_result(entries.get(key))
+        except Exception as e:
+            logger.error("reference_price_refresh_failed", keys=len(futures), error=str(e))
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for key in futures:
+                self._inflight.pop(key, None)
+
+    async def _load_or_fetch(self, keys: list[CacheKey]) -> dict[CacheKey, CachedPrice]:
+        """Nimm noch gültige Zeilen aus der Datenbank, frage den Rest gebündelt pro Quelle ab."""
+        now = datetime.utcnow()
+        stored = await self._load(keys)
+        entries = {key: entry for key, entry in stored.items() if entry.expires_at > now}
+        stale = [key for key in keys if key not in entries]
+        if stale:
+            entries.update(await self._refresh(stale, stored))
+        self._cache.update(entries)
+        return entries
+
+    async def _refresh(
+        self, keys: list[CacheKey], stored: Mapping[CacheKey, CachedPrice]
+    ) -> dict[CacheKey, CachedPrice]:
+        queries = await self._product_queries({product_id for product_id, _ in keys})
+        by_source: dict[str, dict[int, str]] = {}
+        for product_id, source in keys:
+            if source in self.sources and product_id in queries:
+                by_source.setdefault(source, {})[product_id] = queries[product_id]
+
+        now = datetime.utcnow()
+        entries: dict[CacheKey, CachedPrice] = {}
+        for source, batch in by_source.items():
+            started_at = time.perf_counter()
+            quotes = await self.sources[source].fetch(batch)
+            REFERENCE_PRICE_FETCHES.labels(source).observe(time.perf_counter() - started_at)
+            for product_id in batch:
+                key = (product_id, source)
+                quote = quotes.get(product_id)
+                previous = stored.get(key) or self._cache.get(key)
+                # Ohne Antwort der Quelle bleiben bisheriger Preis und Link gültig
+                price = quote.price if quote else previous.price if previous else None
+                url = quote.url if quote else previous.url if previous else None
+                changed = previous is None or previous.price != price
+                updated_at = now if changed else previous.updated_at
+                entries[key] = CachedPrice(
+                    price=price,
+                    updated_at=updated_at,
+                    checked_at=now,
+                    expires_at=now + reference_ttl(updated_at, now, self.min_ttl, self.max_ttl),
+                    url=url,
+                )
+            logger.info("reference_prices_fetched", source=source, products=len(batch), found=len(quotes))
+
+        await self._store(entries, stored)
+        return entries
+
+    async def _product_queries(self, product_ids: set[int]) -> dict[int, str]:
+        if self.session_factory is None:
+            return {product_id: str(product_id) for product_id in product_ids}
+        async with self.session_factory() as session:
+            rows = await session.execute(
+                select(Product.id, Product.name, Product.filters).where(Product.id.in_(product_ids))
+            )
+            return {product_id: (filters or {}).get("query") or name for product_id, name, filters in rows}
+
+    async def _load(self, keys: list[CacheKey]) -> dict[CacheKey, CachedPrice]:
+        if self.session_factory is None:
+            return {}
+        async with self.session_factory() as session:
+            rows = await session.execute(
+                select(
+                    PriceReference.product_id,
+                    PriceReference.source,
+                    PriceReference.price,
+                    PriceReference.url,
+                    PriceReference.updated_at,
+                    PriceReference.checked_at,
+                ).where(tuple_(PriceReference.product_id, PriceReference.source).in_(keys))
+            )
+            entries = {}
+            for product_id, source, price, url, updated_at, checked_at in rows:
+                updated_at, checked_at = _naive(updated_at), _naive(checked_at or updated_at)
+                entries[(product_id, source)] = CachedPrice(
+                    price=price,
+                    updated_at=updated_at,
+                    checked_at=checked_at,
+                    expires_at=checked_at + reference_ttl(updated_at, checked_at, self.min_ttl, self.max_ttl),
+                    url=url,
+                )
+            return entries
+
+    async def _store(self, entries: Mapping[CacheKey, CachedPrice], stored: Mapping[CacheKey, CachedPrice]) -> None:
+        """Schreibe Abgleiche gesammelt; Margen nur für Produkte mit geändertem Preis neu berechnen."""
+        if self.session_factory is None:
+            return
+        new_rows, changed_rows, checked_rows = [], [], []
+        changed_product_ids: set[int] = set()
+        for (product_id, source), entry in entries.items():
+            if entry.price is None:
+                continue
+            row = {"b_product_id": product_id, "b_source": source, "checked_at": entry.checked_at}
+            previous = stored.get((product_id, source))
+            if previous is None:
+                new_rows.append(
+                    {
+                        "product_id": product_id,
+                        "source": source,
+                        "price": entry.price,
+                        "url": entry.url,
+                        "updated_at": entry.updated_at,
+                        "checked_at": entry.checked_at,
+                    }
+                )
+                changed_product_ids.add(product_id)
+            elif previous.price != entry.price or previous.url != entry.url:
+                changed_rows.append(
+                    {**row, "price": entry.price, "url": entry.url, "updated_at": entry.updated_at}
+                )
+                if previous.price != entry.price:
+                    changed_product_ids.add(product_id)
+            else:
+                checked_rows.append(row)
+        if not (new_rows or changed_rows or checked_rows):
+            return
+
+        where = (
+            PriceReference.product_id == bindparam("b_product_id"),
+            PriceReference.source == bindparam("b_source"),
+        )
+        async with self.session_factory() as session:
+            if new_rows:
+                await session.execute(insert(PriceReference), new_rows)
+            # executemany pro Gruppe statt eines UPDATEs pro Schlüssel
+            if changed_rows:
+                await session.execute(
+                    update(PriceReference.__table__).where(*where).values(
+                        price=bindparam("price"),
+                        url=bindparam("url"),
+                        updated_at=bindparam("updated_at"),
+                        checked_at=bindparam("checked_at"),
+                    ),
+                    changed_rows,
+                )
+            if checked_rows:
+                await session.execute(
+                    update(PriceReference.__table__).where(*where).values(checked_at=bindparam("checked_at")),
+                    checked_rows,
+                )
+            margins = None
+            if changed_product_ids:
+                margins = await session.run_sync(
+                    lambda sync_session: recompute_margins(sync_session.connection(), changed_product_ids)
+                )
+            await session.commit()
+        if margins and margins.updated:
+            await bump_version(get_optional_redis(), OFFERS_VERSION_KEY)
+
+    async def refresh_expiring(self) -> int:
+        """Erneuere alle Einträge, die innerhalb von `refresh_ahead` ablaufen, in einem Durchgang."""
+        horizon = datetime.utcnow() + self.refresh_ahead
+        keys = [
+            key
+            for key, entry in self._cache.items()
+            if entry.expires_at <= horizon and key not in self._inflight
+        ]
+        if keys:
+            futures = self._start_fetch(keys)
+            await asyncio.gather(*futures.values(), return_exceptions=True)
+        return len(keys)
+
+    async def _refresh_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                refreshed = await self.refresh_expiring()
+                if refreshed:
+                    logger.info("reference_prices_refreshed_ahead", entries=refreshed)
+            except Exception as e:
+                logger.error("reference_price_refresh_loop_failed", error=str(e))
+
+    def start(self, interval: float = settings.reference_price_refresh_interval) -> None:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop(interval))
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        for source in self.sources.values():
+            if isinstance(source, HttpPriceSource):
+                await source.aclose()
+
+
+def _naive(value: datetime) -> datetime:
+    # timestamptz kommt mit Zeitzone zurück, der Rest des Backends rechnet in naivem UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+reference_prices = ReferencePriceService(
+    [HttpPriceSource(name, url_template) for name, url_template in settings.reference_price_sources.items()],
+    session_factory=new_session if settings.database_url else None,
+)
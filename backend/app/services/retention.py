@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import structlog
+from sqlalchemy import ColumnElement, Connection, Table, delete, func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from ..models import Contact, Offer, OfferArchive, PriceHistory
+
+
+logger = structlog.get_logger(__name__)
+
+# Endstatus: diese Angebote werden nicht mehr bearbeitet und nach der Aufbewahrungszeit archiviert
+RETENTION_STATUSES = ("rejected", "ignored", "contacted", "sold", "expired", "duplicate")
+
+# Angebote pro Statement; kurze Transaktionen halten Sperren und WAL-Spitzen klein
+ARCHIVE_BATCH_SIZE = 1000
+
+ARCHIVED_COLUMNS = tuple(
+    column.name for column in OfferArchive.__table__.columns
+    if column.name not in ("archived_at", "price_history", "contacts")
+)
+
+
+def _children_json(table: Table, order_by: ColumnElement) -> ColumnElement:
+    # Ganze Zeilen als JSONB-Array, damit das Archiv-Schema Änderungen der Kindtabellen übersteht
+    return func.coalesce(
+        select(func.jsonb_agg(aggregate_order_by(func.to_jsonb(literal_column(table.name)), order_by)))
+        .where(table.c.offer_id == literal_column("moved.id"))
+        .scalar_subquery(),
+        literal_column("'[]'::jsonb"),
+    )
+
+
+def archive_offers(connection: Connection, older_than: timedelta, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Verschiebe einen Batch abgeschlossener Angebote samt Historie und Kontakten ins Archiv.
+
+    Ein Statement: `DELETE ... RETURNING` auf `offers` als CTE, daraus `INSERT` ins Archiv.
+    Alle Teile sehen denselben Snapshot, die Kindzeilen werden also vor dem Cascade-Delete
+    gelesen. Alter nach `first_seen_at`, damit auch weiter gelistete Angebote herausfallen.
+    Gibt die Anzahl verschobener Angebote zurück.
+    """
+    offers = Offer.__table__
+    candidates = (
+        select(offers.c.id)
+        .where(
+            offers.c.status.in_(RETENTION_STATUSES),
+            offers.c.first_seen_at < datetime.utcnow() - older_than,
+        )
+        .order_by(offers.c.first_seen_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(offers)
+        .where(offers.c.id.in_(candidates.scalar_subquery()))
+        .returning(*(offers.c[name] for name in ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+    price_history = PriceHistory.__table__
+    contacts = Contact.__table__
+    stmt = (
+        insert(OfferArchive)
+        .from_select(
+            [*ARCHIVED_COLUMNS, "archived_at", "price_history", "contacts"],
+            select(
+                *(moved.c[name] for name in ARCHIVED_COLUMNS),
+                func.now(),
+                _children_json(price_history, price_history.c.recorded_at),
+                _children_json(contacts, contacts.c.sent_at),
+            ),
+        )
+        .add_cte(moved)
+    )
+    archived = connection.execute(stmt).rowcount
+    logger.info("offers_archived", offers=archived, older_than_days=older_than.days)
+    return archived
@@ -0,0 +1,85 @@
+import json
+from typing import Any
+
+import structlog
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import Connection, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas import StatsOut
+
+
+logger = structlog.get_logger(__name__)
+
+STATS_CACHE_KEY = "stats:dashboard"
+STATS_CACHE_TTL_SECONDS = 30
+# Von den Schreibpfaden gesetzt (mark_stats_dirty); der periodische Refresh-Task prüft und löscht das Flag
+STATS_DIRTY_KEY = "stats:dirty"
+
+DAILY_STATS_DAYS = 90
+
+# Materialized Views mit Unique-Index (Migration 0004), damit REFRESH ... CONCURRENTLY
+# Leser nicht blockiert. Änderungen an den Views kommen als neue Revision (DROP + CREATE).
+STATS_VIEWS = ("offer_status_counts", "product_margin_stats", "offer_daily_counts")
+
+
+async def mark_stats_dirty(redis: Redis | None) -> None:
+    """Nach dem Commit: Views beim nächsten Refresh-Lauf neu berechnen; Redis-Fehler nur loggen."""
+    if redis is None:
+        return
+    try:
+        await redis.set(STATS_DIRTY_KEY, 1)
+    except RedisError as e:
+        logger.warning("stats_dirty_flag_failed", error=str(e))
+
+
+def refresh_stats_views(connection: Connection) -> None:
+    for view in STATS_VIEWS:
+        connection.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    logger.info("stats_views_refreshed")
+
+
+async def load_stats(session: AsyncSession) -> StatsOut:
+    status_counts = await session.execute(text("SELECT status, offers FROM offer_status_counts"))
+    products = await session.execute(
+        text(
+            "SELECT product_id, name, offers, avg_margin, best_margin "
+            "FROM product_margin_stats ORDER BY product_id"
+        )
+    )
+    daily = await session.execute(
+        text(
+            "SELECT day, offers FROM offer_daily_counts "
+            "WHERE day >= CURRENT_DATE - CAST(:days AS integer) ORDER BY day"
+        ),
+        {"days": DAILY_STATS_DAYS},
+    )
+    return StatsOut(
+        status_counts=dict(status_counts.all()),
+        products=[dict(row) for row in products.mappings()],
+        daily_new_offers=[dict(row) for row in daily.mappings()],
+    )
+
+
+async def get_cached_stats(session: AsyncSession, redis: Redis | None) -> dict[str, Any]:
+    """Dashboard-Statistiken aus dem Redis-Cache, bei Miss aus den Materialized Views.
+
+    Ohne bzw. bei ausgefallenem Redis direkt aus den Views.
+    """
+    if redis is None:
+        return (await load_stats(session)).model_dump(mode="json")
+    try:
+        cached = await redis.get(STATS_CACHE_KEY)
+    except RedisError as e:
+        logger.warning("stats_cache_unavailable", error=str(e))
+        return (await load_stats(session)).model_dump(mode="json")
+    if cached:
+        return json.loads(cached)
+
+    stats = (await load_stats(session)).model_dump(mode="json")
+    try:
+        await redis.set(STATS_CACHE_KEY, json.dumps(stats), ex=STATS_CACHE_TTL_SECONDS)
+    except RedisError as e:
+        logger.warning("stats_cache_unavailable", error=str(e))
+    return stats
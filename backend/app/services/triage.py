@@ -0,0 +1,61 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import ColumnElement, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Offer
+from ..schemas import OfferBulkStatusResult, OfferBulkStatusUpdate
+
+
+def _status_conditions(payload: OfferBulkStatusUpdate) -> list[ColumnElement[bool]]:
+    # Angebote, die schon im Zielstatus sind, werden weder gezählt noch neu geschrieben
+    conditions = [Offer.status != payload.status]
+    if payload.ids is not None:
+        conditions.append(Offer.id.in_(set(payload.ids)))
+        return conditions
+
+    filters = payload.filters
+    if filters.status:
+        conditions.append(Offer.status == filters.status)
+    if filters.product_id:
+        conditions.append(Offer.product_id == filters.product_id)
+    if filters.min_margin is not None:
+        conditions.append(Offer.margin_percent >= filters.min_margin)
+    if filters.max_margin is not None:
+        conditions.append(Offer.margin_percent < filters.max_margin)
+    if filters.older_than_hours is not None:
+        conditions.append(Offer.first_seen_at < datetime.utcnow() - timedelta(hours=filters.older_than_hours))
+    return conditions
+
+
+async def update_offer_statuses(session: AsyncSession, payload: OfferBulkStatusUpdate) -> OfferBulkStatusResult:
+    """Setze den Status aller getroffenen Angebote in einem `UPDATE ... RETURNING`.
+
+    `dry_run` zählt nur, aufgeteilt nach bisherigem Status, und schreibt nichts.
+    """
+    conditions = _status_conditions(payload)
+    if payload.dry_run:
+        rows = (
+            await session.execute(select(Offer.status, func.count()).where(*conditions).group_by(Offer.status))
+        ).all()
+        by_status = dict(rows)
+        return OfferBulkStatusResult(dry_run=True, matched=sum(by_status.values()), by_status=by_status)
+
+    # Bisheriger Status per Self-Join, damit RETURNING ihn neben der id liefern kann
+    offers = Offer.__table__
+    previous = offers.alias("previous")
+    stmt = (
+        update(offers)
+        .where(previous.c.id == offers.c.id, *conditions)
+        .values(status=payload.status, last_checked_at=datetime.utcnow())
+        .returning(offers.c.id, previous.c.status)
+    )
+    rows = (await session.execute(stmt)).all()
+    await session.commit()
+
+    return OfferBulkStatusResult(
+        matched=len(rows),
+        by_status=Counter(previous_status for _, previous_status in rows),
+        ids=sorted(offer_id for offer_id, _ in rows),
+    )
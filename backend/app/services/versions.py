@@ -0,0 +1,93 @@
+import time
+
+import structlog
+from fastapi import Request
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Änderungszähler pro Tabelle, von allen Schreibpfaden erhöht; Grundlage der ETags
+OFFERS_VERSION_KEY = "version:offers"
+PRODUCTS_VERSION_KEY = "version:products"
+# Neue Produktversion für die Katalog-Snapshots der Scraper (scraper/catalog.py)
+CATALOG_CHANNEL = "catalog:products"
+
+
+def _initial_version() -> int:
+    # Fehlt der Zähler (Redis geleert), startet er bei der aktuellen Zeit in ms statt bei 0,
+    # damit keine alte Version und damit kein alter ETag erneut vergeben wird
+    return time.time_ns() // 1_000_000
+
+
+async def bump_version(redis: Redis | None, *keys: str) -> list[int] | None:
+    """Erhöhe die Zähler und gib die neuen Versionen in der Reihenfolge von `keys` zurück.
+
+    Läuft nach dem Commit, darf den Schreibzugriff also nicht mehr scheitern lassen: ohne
+    bzw. bei ausgefallenem Redis wird nur geloggt und None zurückgegeben.
+    """
+    if redis is None:
+        return None
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.set(key, _initial_version(), nx=True)
+                pipe.incr(key)
+            results = await pipe.execute()
+    except RedisError as e:
+        logger.warning("version_bump_failed", keys=keys, error=str(e))
+        return None
+    return results[1::2]
+
+
+def bump_version_sync(redis: SyncRedis, *keys: str) -> None:
+    """Wie `bump_version`, für Celery Tasks."""
+    with redis.pipeline(transaction=True) as pipe:
+        for key in keys:
+            pipe.set(key, _initial_version(), nx=True)
+            pipe.incr(key)
+        pipe.execute()
+
+
+async def current_version(redis: Redis, key: str) -> int:
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.set(key, _initial_version(), nx=True)
+        pipe.get(key)
+        _, version = await pipe.execute()
+    return int(version)
+
+
+async def collection_etag(redis: Redis | None, key: str) -> str | None:
+    """Schwacher ETag einer Collection: ändert sich mit jedem Schreibzugriff auf die Tabelle.
+
+    None ohne bzw. bei ausgefallenem Redis; die Liste wird dann ohne ETag ausgeliefert.
+    """
+    if redis is None:
+        return None
+    try:
+        version = await current_version(redis, key)
+    except RedisError as e:
+        logger.warning("etag_unavailable", key=key, error=str(e))
+        return None
+    return f'W/"{key.removeprefix("version:")}-{version}"'
+
+
+def etag_matches(request: Request, etag: str | None) -> bool:
+    """Schwacher Vergleich gegen `If-None-Match` (RFC 9110: W/-Präfix wird ignoriert)."""
+    if_none_match = request.headers.get("if-none-match")
+    if etag is None or not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str | None) -> dict[str, str]:
+    # no-cache: Browser speichern die Antwort, fragen aber jedes Mal mit If-None-Match nach
+    if etag is None:
+        return {"Cache-Control": "no-cache"}
+    return {"ETag": etag, "Cache-Control": "no-cache"}
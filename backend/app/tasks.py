@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+from .cache import get_sync_redis
+from .config import get_settings
+from .database import get_sync_session
+from .services import history, retention, stats
+from .services.versions import OFFERS_VERSION_KEY, bump_version_sync
+from .worker import celery_app
+
+
+settings = get_settings()
+
+sync_session = contextmanager(get_sync_session)
+
+
+@celery_app.task(name="app.tasks.compact_price_history")
+def compact_price_history() -> int:
+    with sync_session() as session:
+        rows = history.compact_price_history(session.connection(), settings.price_history_raw_days)
+        session.commit()
+    return rows
+
+
+@celery_app.task(name="app.tasks.refresh_stats")
+def refresh_stats(force: bool = False) -> bool:
+    """Materialized Views auffrischen, wenn seit dem letzten Lauf ingestiert wurde."""
+    redis = get_sync_redis()
+    if not force and not redis.getdel(stats.STATS_DIRTY_KEY):
+        return False
+
+    with sync_session() as session:
+        stats.refresh_stats_views(session.connection())
+        session.commit()
+    redis.delete(stats.STATS_CACHE_KEY)
+    return True
+
+
+@celery_app.task(name="app.tasks.archive_offers")
+def archive_offers() -> int:
+    """Abgeschlossene Angebote batchweise archivieren, bis keine fälligen mehr übrig sind."""
+    older_than = timedelta(days=settings.offer_retention_days)
+    total = 0
+    while True:
+        with sync_session() as session:
+            archived = retention.archive_offers(session.connection(), older_than)
+            session.commit()
+        total += archived
+        if archived < retention.ARCHIVE_BATCH_SIZE:
+            break
+
+    if total:
+        redis = get_sync_redis()
+        redis.set(stats.STATS_DIRTY_KEY, 1)
+        bump_version_sync(redis, OFFERS_VERSION_KEY)
+    return total
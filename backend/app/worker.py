@@ -0,0 +1,40 @@
+from celery import Celery
+from celery.schedules import crontab
+
+from .config import get_settings
+
+
+settings = get_settings()
+
+# Celery-App für periodische Wartungsjobs (sync SQLAlchemy, siehe database.get_sync_session)
+celery_app = Celery(
+    "margin_hunter",
+    broker=settings.redis_url,
+    include=["app.tasks"],
+)
+
+celery_app.conf.update(
+    timezone="UTC",
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    beat_schedule={
+        "compact-price-history": {
+            "task": "app.tasks.compact_price_history",
+            "schedule": crontab(hour=3, minute=0),
+        },
+        "archive-offers": {
+            "task": "app.tasks.archive_offers",
+            "schedule": crontab(hour=3, minute=30),
+        },
+        # Prüft das Dirty-Flag der Ingestion; ein voller Refresh zusätzlich alle 10 Minuten
+        "refresh-stats": {
+            "task": "app.tasks.refresh_stats",
+            "schedule": 15.0,
+        },
+        "refresh-stats-full": {
+            "task": "app.tasks.refresh_stats",
+            "schedule": 600.0,
+            "kwargs": {"force": True},
+        },
+    },
+)
@@ -0,0 +1,137 @@
+"""Duplikaterkennung: Latenz von `find_duplicates` inklusive Bucket-Join in Postgres.
+
+Legt in einer Transaktion ein Produkt mit `--size` synthetischen Angeboten samt
+LSH-Buckets an, misst danach Batches aus Reposts und unbekannten Angeboten so, wie die
+Ingestion sie pro Chunk abfragt, und rollt am Ende alles zurück. Braucht DATABASE_URL
+auf eine migrierte Datenbank.
+Aufruf aus dem backend-Verzeichnis:
+    python -m benchmarks.bench_dedup --size 200000 --batch 500 --batches 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("DEBUG", "true")
+
+from sqlalchemy import func, insert, select, text
+
+from app.database import new_session
+from app.models import Offer, OfferLshBucket, Product
+from app.schemas import OfferCreate
+from app.services.dedup import (
+    MINHASH_PERMUTATIONS,
+    find_duplicates,
+    offer_signature,
+    pack_signature,
+    store_buckets,
+)
+
+
+SEED_CHUNK_SIZE = 5000
+
+
+def random_signature(rng: random.Random) -> tuple[int, ...]:
+    return tuple(rng.getrandbits(32) for _ in range(MINHASH_PERMUTATIONS))
+
+
+def repost(signature: tuple[int, ...], rng: random.Random, changed: int) -> tuple[int, ...]:
+    # Jaccard ~0.8: etwa jede fünfte Permutation liefert ein anderes Minimum
+    positions = set(rng.sample(range(MINHASH_PERMUTATIONS), changed))
+    return tuple(rng.getrandbits(32) if i in positions else value for i, value in enumerate(signature))
+
+
+def signature_ms(runs: int = 1000) -> float:
+    offer = OfferCreate(
+        product_id=1,
+        title="NVIDIA RTX 3080 Founders Edition OVP",
+        price=450.0,
+        url="https://www.kleinanzeigen.de/s-anzeige/rtx-3080/2700000000",
+        seller_name="Max",
+        description="Verkaufe meine RTX 3080 im Top-Zustand mit OVP und Rechnung.",
+    )
+    start = time.perf_counter()
+    for _ in range(runs):
+        offer_signature(offer)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+async def run(size: int, batch: int, batches: int, changed: int) -> None:
+    rng = random.Random(42)
+    async with new_session() as session:
+        product_id = await session.scalar(
+            insert(Product)
+            .values(name="bench_dedup", category="bench", price_min=0, price_max=10_000)
+            .returning(Product.id)
+        )
+        stored: list[tuple[int, ...]] = []
+        now = datetime.utcnow()
+        start = time.perf_counter()
+        for offset in range(0, size, SEED_CHUNK_SIZE):
+            signatures = [random_signature(rng) for _ in range(min(SEED_CHUNK_SIZE, size - offset))]
+            rows = [
+                {
+                    "product_id": product_id,
+                    "title": f"bench_dedup {offset + i}",
+                    "price": 450.0,
+                    "url": f"bench-dedup://{product_id}/{offset + i}",
+                    "status": "new",
+                    "minhash": pack_signature(signature),
+                    "first_seen_at": now,
+                    "last_checked_at": now,
+                }
+                for i, signature in enumerate(signatures)
+            ]
+            ids = (
+                await session.scalars(insert(Offer).returning(Offer.id, sort_by_parameter_order=True), rows)
+            ).all()
+            await store_buckets(session, [(offer_id, product_id, sig) for offer_id, sig in zip(ids, signatures)])
+            stored.extend(signatures)
+        await session.execute(text("ANALYZE offers, offer_lsh_buckets"))
+        seed_s = time.perf_counter() - start
+
+        timings, hits = [], 0
+        for number in range(batches):
+            # Halb Reposts aus dem Bestand, halb unbekannte Angebote
+            signatures = [repost(rng.choice(stored), rng, changed) for _ in range(batch // 2)]
+            signatures += [random_signature(rng) for _ in range(batch - len(signatures))]
+            offers = [
+                OfferCreate(product_id=product_id, title="x", price=450.0, url=f"bench-dedup://new/{number}/{i}")
+                for i in range(batch)
+            ]
+            by_url = {offer.url: signature for offer, signature in zip(offers, signatures)}
+            start = time.perf_counter()
+            duplicates, _ = await find_duplicates(session, offers, by_url)
+            timings.append((time.perf_counter() - start) * 1000)
+            hits += len(duplicates)
+
+        bucket_rows = await session.scalar(
+            select(func.count()).select_from(OfferLshBucket).where(OfferLshBucket.product_id == product_id)
+        )
+        await session.rollback()
+
+    print(f"Signatur berechnen:  {signature_ms():.3f} ms/Angebot")
+    print(f"Bestand anlegen:     {size} Angebote, {bucket_rows} Bucket-Zeilen in {seed_s:.1f} s")
+    print(
+        f"find_duplicates:     {batch} Angebote/Batch  p50 {statistics.median(timings):7.1f} ms"
+        f"  max {max(timings):7.1f} ms  ({statistics.median(timings) / batch * 1000:.0f} µs/Angebot)"
+    )
+    print(f"Reposts erkannt:     {hits}/{batches * (batch // 2)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500, help="Angebote pro Abfrage (BULK_CHUNK_SIZE)")
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--changed", type=int, default=6, help="veränderte Permutationen pro Repost")
+    args = parser.parse_args()
+    asyncio.run(run(args.size, args.batch, args.batches, args.changed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Umkreisfilter: vektorisierte Haversine-Distanz gegen eine Python-Schleife.
+
+Misst den Filter der Ingestion für zufällige Koordinaten in Deutschland. Keine DB.
+Aufruf aus dem backend-Verzeichnis:
+    python -m benchmarks.bench_geo --points 100000 --radius 50
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+
+os.environ.setdefault("DEBUG", "true")
+
+from app.services.geo import EARTH_RADIUS_KM, within_radius
+
+
+def haversine_loop(center: tuple[float, float], points: list[tuple[float, float]], radius_km: float) -> list[bool]:
+    lat1, lon1 = map(math.radians, center)
+    inside = []
+    for lat, lon in points:
+        lat2, lon2 = math.radians(lat), math.radians(lon)
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        inside.append(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a))) <= radius_km)
+    return inside
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--radius", type=float, default=50.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # Grob die Ausdehnung Deutschlands
+    points = [(rng.uniform(47.3, 55.0), rng.uniform(5.9, 15.0)) for _ in range(args.points)]
+    berlin = (52.52, 13.405)
+
+    start = time.perf_counter()
+    expected = haversine_loop(berlin, points, args.radius)
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    mask = within_radius(berlin, args.radius, points)
+    numpy_ms = (time.perf_counter() - start) * 1000
+
+    assert mask.tolist() == expected
+    print(f"{args.points} Punkte, {sum(expected)} im Umkreis von {args.radius:g} km")
+    print(f"Python-Schleife: {loop_ms:8.1f} ms")
+    print(f"NumPy:           {numpy_ms:8.1f} ms  ({loop_ms / numpy_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Referenzpreise: Upstream-Abrufe bei vielen gleichzeitigen Abfragen gegen eine Fake-Quelle.
+
+Simuliert parallele Bulk-Ingests, die jeweils die Referenzpreise ihrer Produkte anfragen,
+und zählt, wie viele Abrufe tatsächlich bei der Quelle ankommen. Keine DB.
+Aufruf aus dem backend-Verzeichnis:
+    python -m benchmarks.bench_reference_prices --products 200 --requests 2000 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("DEBUG", "true")
+
+from app.services.reference_prices import ReferencePriceService, StaticPriceSource
+
+
+async def run(products: int, requests: int, per_request: int, latency: float) -> None:
+    prices = {product_id: 100.0 + product_id for product_id in range(products)}
+    sources = [StaticPriceSource("geizhals", prices, latency), StaticPriceSource("idealo", prices, latency)]
+    service = ReferencePriceService(sources, min_ttl=60, max_ttl=3600, refresh_ahead=30)
+    rng = random.Random(42)
+
+    batches = [rng.sample(range(products), per_request) for _ in range(requests)]
+    started_at = time.perf_counter()
+    await asyncio.gather(*(service.get_many(batch) for batch in batches))
+    cold = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(service.get_many(batch) for batch in batches))
+    warm = time.perf_counter() - started_at
+
+    lookups = requests * per_request * len(sources)
+    naive_calls = lookups  # ein Upstream-Abruf pro Angebot und Quelle
+    upstream_calls = sum(source.calls for source in sources)
+    print(f"Abfragen:            {lookups} ({requests} Requests × {per_request} Produkte × {len(sources)} Quellen)")
+    print(f"Upstream-Abrufe:     {upstream_calls} (naiv: {naive_calls})")
+    print(f"Kalt (mit Latenz):   {cold:.2f} s")
+    print(f"Warm (nur Cache):    {warm * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--per-request", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(run(args.products, args.requests, args.per_request, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Serialisierung von Angebotslisten: ORM + Pydantic (bisheriger Pfad) vs. Tupel + orjson.
+
+Misst nur die Arbeit nach der Query (Hydration, Validierung, JSON), keine DB.
+Aufruf aus dem backend-Verzeichnis:
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DEBUG", "true")
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.offers import OFFER_FIELDS
+from app.models import Offer
+from app.schemas import OfferOut
+
+
+def build_rows(count: int) -> list[tuple]:
+    now = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        values = {
+            "id": i,
+            "duplicate_of_id": None,
+            "product_id": i % 50,
+            "title": f"NVIDIA RTX 3080 Founders Edition #{i}",
+            "price": 450.0 + i % 100,
+            "url": f"https://www.kleinanzeigen.de/s-anzeige/rtx-3080/{2_700_000_000 + i}",
+            "image_url": f"https://img.kleinanzeigen.de/api/v1/prod-ads/images/{i}",
+            "seller_name": "Max",
+            "location": "10115 Berlin",
+            "latitude": 52.5323,
+            "longitude": 13.3846,
+            "description": "Verkaufe meine RTX 3080 im Top-Zustand mit OVP und Rechnung. " * 3,
+            "status": "new",
+            "margin_percent": 22.5,
+            "geizhals_price": 599.0,
+            "first_seen_at": now - timedelta(minutes=i),
+            "last_checked_at": now,
+        }
+        rows.append(tuple(values[field] for field in OFFER_FIELDS))
+    return rows
+
+
+def orm_pydantic(rows: list[tuple]) -> bytes:
+    # Nachbildung von select(Offer) + response_model=list[OfferOut]
+    offers = [Offer(**dict(zip(OFFER_FIELDS, row))) for row in rows]
+    validated = TypeAdapter(list[OfferOut]).validate_python(offers, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def tuples_orjson(rows: list[tuple]) -> bytes:
+    return orjson.dumps([dict(zip(OFFER_FIELDS, row)) for row in rows])
+
+
+def measure(serialize: Callable[[list[tuple]], bytes], rows: list[tuple], repeat: int) -> tuple[float, float, float]:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        serialize(rows)
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    tracemalloc.start()
+    serialize(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return statistics.median(timings), p99, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    print(f"{'path':<16} {'p50 ms':>9} {'p99 ms':>9} {'peak MiB':>9}")
+    for name, serialize in (("orm+pydantic", orm_pydantic), ("tuples+orjson", tuples_orjson)):
+        p50, p99, peak = measure(serialize, rows, args.repeat)
+        print(f"{name:<16} {p50:>9.1f} {p99:>9.1f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, make_url, pool
+
+from app.config import get_settings
+from app.database import Base
+from app import models  # noqa: F401  (registriert alle Tabellen in Base.metadata)
+
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    """Migrationen laufen synchron: DATABASE_URL_SYNC, sonst DATABASE_URL mit psycopg2-Treiber."""
+    settings = get_settings()
+    if settings.database_url_sync:
+        return settings.database_url_sync
+    if settings.database_url:
+        return make_url(settings.database_url).set(drivername="postgresql+psycopg2").render_as_string(
+            hide_password=False
+        )
+    raise RuntimeError("Set DATABASE_URL_SYNC or DATABASE_URL to run migrations.")
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # Eigene Engine ohne Pool: Migrationen sollen keine App-Engine (und keine Metrik-Hooks) erzeugen
+    connectable = create_engine(_database_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,104 @@
+"""Baseline schema (Stand vor Alembic, bisher per create_all angelegt)
+
+Bestehende Datenbanken, die noch per `create_all` entstanden sind, werden einmalig mit
+`alembic stamp 0001` markiert und dann per `alembic upgrade head` nachgezogen.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("brands", postgresql.JSONB(), nullable=False),
+        sa.Column("filters", postgresql.JSONB(), nullable=False),
+        sa.Column("price_min", sa.Float(), nullable=False),
+        sa.Column("price_max", sa.Float(), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+
+    op.create_table(
+        "offers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("url", sa.String(500), nullable=False, unique=True),
+        sa.Column("image_url", sa.String(500), nullable=True),
+        sa.Column("seller_name", sa.String(255), nullable=True),
+        sa.Column("location", sa.String(255), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("margin_percent", sa.Float(), nullable=True),
+        sa.Column("geizhals_price", sa.Float(), nullable=True),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_checked_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_offers_id", "offers", ["id"])
+    op.create_index("ix_offers_product_id", "offers", ["product_id"])
+
+    op.create_table(
+        "price_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("offer_id", sa.Integer(), sa.ForeignKey("offers.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_price_history_id", "price_history", ["id"])
+    op.create_index("ix_price_history_offer_id", "price_history", ["offer_id"])
+
+    op.create_table(
+        "contacts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("offer_id", sa.Integer(), sa.ForeignKey("offers.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("message_template", sa.Text(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("response_received", sa.Boolean(), nullable=False),
+        sa.Column("notes", sa.String(), nullable=True),
+    )
+    op.create_index("ix_contacts_id", "contacts", ["id"])
+    op.create_index("ix_contacts_offer_id", "contacts", ["offer_id"])
+
+    op.create_table(
+        "price_references",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("source", sa.String(50), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("url", sa.String(500), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_price_references_id", "price_references", ["id"])
+    op.create_index("ix_price_references_product_id", "price_references", ["product_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("price_references")
+    op.drop_table("contacts")
+    op.drop_table("price_history")
+    op.drop_table("offers")
+    op.drop_table("products")
@@ -0,0 +1,79 @@
+"""Spalten und Tabellen für Preis-Historie, Volltextsuche, Duplikaterkennung und Referenzpreise
+
+Nur Spalten und Tabellen; die zugehörigen Indizes legt 0003 ohne Tabellensperre an.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('german', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('german', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column("price_history", sa.Column("price_min", sa.Float(), nullable=True))
+    op.add_column("price_history", sa.Column("price_max", sa.Float(), nullable=True))
+    op.add_column("price_history", sa.Column("samples", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column(
+        "price_history", sa.Column("resolution", sa.String(10), nullable=False, server_default="raw")
+    )
+
+    op.add_column("offers", sa.Column("minhash", sa.LargeBinary(), nullable=True))
+    op.add_column(
+        "offers",
+        sa.Column("duplicate_of_id", sa.Integer(), sa.ForeignKey("offers.id", ondelete="SET NULL"), nullable=True),
+    )
+    # Generierte Spalte: einmaliges Umschreiben der Tabelle, danach pflegt Postgres sie selbst
+    op.add_column(
+        "offers",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=False,
+        ),
+    )
+
+    op.add_column("price_references", sa.Column("checked_at", sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table(
+        "offer_lsh_buckets",
+        sa.Column("product_id", sa.Integer(), primary_key=True),
+        sa.Column("band", sa.SmallInteger(), primary_key=True),
+        sa.Column("bucket", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "offer_id", sa.Integer(), sa.ForeignKey("offers.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("offer_lsh_buckets")
+    op.drop_column("price_references", "checked_at")
+    op.drop_column("offers", "search_vector")
+    op.drop_column("offers", "duplicate_of_id")
+    op.drop_column("offers", "minhash")
+    op.drop_column("price_history", "resolution")
+    op.drop_column("price_history", "samples")
+    op.drop_column("price_history", "price_max")
+    op.drop_column("price_history", "price_min")
@@ -0,0 +1,59 @@
+"""Indizes für Pagination, Suche, Re-Check, Duplikaterkennung und Preis-Historie
+
+Alle Indizes entstehen per CREATE INDEX CONCURRENTLY außerhalb der Migrations-Transaktion,
+Schreibzugriffe auf die Tabellen laufen währenddessen weiter. Bricht ein Build ab, bleibt ein
+ungültiger Index zurück: per DROP INDEX CONCURRENTLY entfernen und die Migration wiederholen.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# (Name, Tabelle, Spalten, zusätzliche Optionen für op.create_index)
+INDEXES: tuple[tuple[str, str, list[str], dict[str, Any]], ...] = (
+    ("ix_offers_first_seen_id", "offers", ["first_seen_at", "id"], {}),
+    ("ix_offers_status_first_seen_id", "offers", ["status", "first_seen_at", "id"], {}),
+    ("ix_offers_product_first_seen_id", "offers", ["product_id", "first_seen_at", "id"], {}),
+    ("ix_offers_product_status_first_seen_id", "offers", ["product_id", "status", "first_seen_at", "id"], {}),
+    ("ix_offers_status_margin", "offers", ["status", "margin_percent"], {}),
+    ("ix_offers_product_margin", "offers", ["product_id", "margin_percent"], {}),
+    ("ix_offers_status_last_checked", "offers", ["status", "last_checked_at"], {}),
+    ("ix_offers_search_vector", "offers", ["search_vector"], {"postgresql_using": "gin"}),
+    (
+        "ix_offers_title_trgm",
+        "offers",
+        ["title"],
+        {"postgresql_using": "gin", "postgresql_ops": {"title": "gin_trgm_ops"}},
+    ),
+    ("ix_offers_duplicate_of_id", "offers", ["duplicate_of_id"], {}),
+    ("ix_offer_lsh_buckets_offer_id", "offer_lsh_buckets", ["offer_id"], {}),
+    ("ix_price_history_offer_recorded", "price_history", ["offer_id", "recorded_at"], {}),
+    ("ix_price_history_recorded_at_brin", "price_history", ["recorded_at"], {"postgresql_using": "brin"}),
+    ("ix_price_references_product_source", "price_references", ["product_id", "source"], {}),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True, **options
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,105 @@
+"""Materialized Views fürs Dashboard und NOTIFY-Trigger für den Offer-Stream
+
+Bisher wurde die DDL bei jedem Start ausgeführt (idempotent: IF NOT EXISTS bzw.
+CREATE OR REPLACE). Spätere Änderungen an Views oder Trigger gehören in eine neue
+Revision, die sie löscht und neu anlegt.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# Unique-Index je View, damit REFRESH ... CONCURRENTLY Leser nicht blockiert
+STATS_VIEWS_DDL = (
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS offer_status_counts AS
+    SELECT status, count(*) AS offers
+    FROM offers
+    GROUP BY status
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_offer_status_counts ON offer_status_counts (status)",
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS product_margin_stats AS
+    SELECT
+        products.id AS product_id,
+        products.name AS name,
+        count(offers.id) AS offers,
+        avg(offers.margin_percent) AS avg_margin,
+        max(offers.margin_percent) AS best_margin
+    FROM products
+    LEFT JOIN offers ON offers.product_id = products.id
+    GROUP BY products.id, products.name
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_product_margin_stats ON product_margin_stats (product_id)",
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS offer_daily_counts AS
+    SELECT CAST(date_trunc('day', first_seen_at) AS date) AS day, count(*) AS offers
+    FROM offers
+    GROUP BY 1
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_offer_daily_counts ON offer_daily_counts (day)",
+)
+
+# Trigger statt Publish im Anwendungscode: erfasst jeden Schreibpfad (API, Bulk-Upsert,
+# Margen-Neuberechnung, Celery) und wird erst beim Commit zugestellt
+OFFER_EVENTS_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION notify_offer_event() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('offer_events', json_build_object(
+            'type', CASE WHEN TG_OP = 'INSERT' THEN 'created' ELSE 'updated' END,
+            'id', NEW.id,
+            'product_id', NEW.product_id,
+            'title', NEW.title,
+            'price', NEW.price,
+            'url', NEW.url,
+            'status', NEW.status,
+            'margin_percent', NEW.margin_percent
+        )::text);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER offers_notify_insert
+    AFTER INSERT ON offers
+    FOR EACH ROW
+    WHEN (NEW.duplicate_of_id IS NULL)
+    EXECUTE FUNCTION notify_offer_event()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER offers_notify_update
+    AFTER UPDATE OF status, margin_percent, price ON offers
+    FOR EACH ROW
+    WHEN (
+        OLD.status IS DISTINCT FROM NEW.status
+        OR OLD.margin_percent IS DISTINCT FROM NEW.margin_percent
+        OR OLD.price IS DISTINCT FROM NEW.price
+    )
+    EXECUTE FUNCTION notify_offer_event()
+    """,
+)
+
+
+def upgrade() -> None:
+    for ddl in STATS_VIEWS_DDL + OFFER_EVENTS_DDL:
+        op.execute(ddl)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS offers_notify_update ON offers")
+    op.execute("DROP TRIGGER IF EXISTS offers_notify_insert ON offers")
+    op.execute("DROP FUNCTION IF EXISTS notify_offer_event()")
+    for view in ("offer_daily_counts", "product_margin_stats", "offer_status_counts"):
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view}")
@@ -0,0 +1,56 @@
+"""Archiv-Tabelle für abgeschlossene Angebote
+
+Neue, leere Tabelle: die Indizes entstehen in derselben Transaktion, CONCURRENTLY ist
+hier nicht nötig. Historie und Kontakte werden lz4 statt pglz komprimiert (Postgres ≥ 14).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "offers_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("url", sa.String(500), nullable=False),
+        sa.Column("image_url", sa.String(500), nullable=True),
+        sa.Column("seller_name", sa.String(255), nullable=True),
+        sa.Column("location", sa.String(255), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("margin_percent", sa.Float(), nullable=True),
+        sa.Column("geizhals_price", sa.Float(), nullable=True),
+        sa.Column("duplicate_of_id", sa.Integer(), nullable=True),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_checked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("price_history", postgresql.JSONB(), nullable=False),
+        sa.Column("contacts", postgresql.JSONB(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("url"),
+    )
+    op.create_index("ix_offers_archive_product_id_id", "offers_archive", ["product_id", "id"])
+    op.execute("ALTER TABLE offers_archive ALTER COLUMN price_history SET COMPRESSION lz4")
+    op.execute("ALTER TABLE offers_archive ALTER COLUMN contacts SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_offers_archive_product_id_id", table_name="offers_archive")
+    op.drop_table("offers_archive")
@@ -0,0 +1,44 @@
+"""Koordinaten für Angebote und Archiv, Index für die Umkreissuche
+
+Bestehende Angebote bleiben ohne Koordinaten, bis sie erneut gefunden werden (der Upsert
+schreibt sie mit). Der Index entsteht per CREATE INDEX CONCURRENTLY.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    for table in ("offers", "offers_archive"):
+        op.add_column(table, sa.Column("latitude", sa.Float(), nullable=True))
+        op.add_column(table, sa.Column("longitude", sa.Float(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_offers_lat_lon",
+            "offers",
+            ["latitude", "longitude"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_offers_lat_lon", table_name="offers", postgresql_concurrently=True, if_exists=True)
+
+    for table in ("offers_archive", "offers"):
+        op.drop_column(table, "longitude")
+        op.drop_column(table, "latitude")
@@ -0,0 +1,5 @@
+import os
+
+
+# Ohne .env: Debug-Settings, keine Datenbank, kein Redis
+os.environ.setdefault("DEBUG", "true")
@@ -0,0 +1,65 @@
+"""Duplikaterkennung ohne Datenbank: Reposts innerhalb eines Batches und gegen den Bestand."""
+
+import asyncio
+
+from app.schemas import OfferCreate
+from app.services.dedup import find_duplicates, offer_signature, pack_signature
+
+
+class FakeResult:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+
+    def all(self) -> list[tuple]:
+        return self.rows
+
+
+class FakeSession:
+    """Liefert für den Bucket-Join die vorgegebenen Zeilen (id, product_id, minhash)."""
+
+    def __init__(self, rows: list[tuple] | None = None) -> None:
+        self.rows = rows or []
+
+    async def execute(self, stmt) -> FakeResult:
+        return FakeResult(self.rows)
+
+
+def offer(url: str, product_id: int = 1, **kwargs) -> OfferCreate:
+    fields = {
+        "title": "NVIDIA RTX 3080 Founders Edition OVP",
+        "price": 450.0,
+        "seller_name": "Max",
+        "description": "Verkaufe meine RTX 3080 im Top-Zustand mit OVP und Rechnung.",
+        **kwargs,
+    }
+    return OfferCreate(product_id=product_id, url=f"https://www.kleinanzeigen.de/s-anzeige/{url}", **fields)
+
+
+def detect(offers: list[OfferCreate], rows: list[tuple] | None = None) -> tuple[dict, dict]:
+    signatures = {item.url: offer_signature(item) for item in offers}
+    return asyncio.run(find_duplicates(FakeSession(rows), offers, signatures))
+
+
+def test_repost_within_batch_points_to_first_offer() -> None:
+    first, repost = offer("1", price=449.0), offer("2", price=445.0)
+    other = offer("3", title="Lenovo ThinkPad T14 Gen 3", description="Wie neu, 16 GB RAM.", seller_name="Eva")
+
+    duplicates, batch_duplicates = detect([first, repost, other])
+
+    assert duplicates == {}
+    assert batch_duplicates == {repost.url: first.url}
+
+
+def test_same_listing_for_other_product_is_no_duplicate() -> None:
+    assert detect([offer("1"), offer("2", product_id=2)]) == ({}, {})
+
+
+def test_stored_original_wins_over_batch_original() -> None:
+    stored = offer("1")
+    rows = [(17, 1, pack_signature(offer_signature(stored)))]
+    first, repost = offer("2"), offer("3")
+
+    duplicates, batch_duplicates = detect([first, repost], rows)
+
+    assert duplicates == {first.url: 17, repost.url: 17}
+    assert batch_duplicates == {}
@@ -0,0 +1,171 @@
+"""Referenzpreis-Service ohne Datenbank: TTL, Coalescing, Timeout und Schreiblogik.
+
+Aufruf aus dem backend-Verzeichnis:
+    python -m pytest tests
+"""
+
+import asyncio
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy.sql.dml import Insert, Update
+
+from app.services.reference_prices import (
+    CachedPrice,
+    PriceQuote,
+    ReferencePriceService,
+    StaticPriceSource,
+    reference_ttl,
+)
+
+
+class LinkedPriceSource:
+    """Wie StaticPriceSource, liefert aber einen Link zum Angebot mit."""
+
+    name = "geizhals"
+
+    def __init__(self, prices: Mapping[int, float]) -> None:
+        self.prices = dict(prices)
+
+    async def fetch(self, queries: Mapping[int, str]) -> dict[int, PriceQuote]:
+        return {
+            product_id: PriceQuote(self.prices[product_id], url=f"https://example.org/{product_id}")
+            for product_id in queries
+            if product_id in self.prices
+        }
+
+
+class FakeSession:
+    """Zeichnet Statements samt Parametern auf; run_sync steht für die Margen-Neuberechnung."""
+
+    def __init__(self, log: list) -> None:
+        self.log = log
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    async def execute(self, stmt, params=None) -> list:
+        self.log.append((stmt, params))
+        return []
+
+    async def run_sync(self, fn) -> SimpleNamespace:
+        self.log.append(("recompute_margins", None))
+        return SimpleNamespace(updated=0)
+
+    async def commit(self) -> None:
+        return None
+
+
+def service(*sources, **kwargs) -> ReferencePriceService:
+    kwargs.setdefault("min_ttl", 60)
+    kwargs.setdefault("max_ttl", 3600)
+    return ReferencePriceService(list(sources), **kwargs)
+
+
+def cached(price: float, url: str | None = None, **kwargs) -> CachedPrice:
+    now = datetime.utcnow()
+    return CachedPrice(price=price, updated_at=now, checked_at=now, expires_at=now, url=url, **kwargs)
+
+
+def test_ttl_grows_with_price_stability_and_is_clamped() -> None:
+    now = datetime.utcnow()
+
+    assert reference_ttl(now, now, 60, 3600) == timedelta(seconds=60)
+    assert reference_ttl(now - timedelta(seconds=1000), now, 60, 3600) == timedelta(seconds=500)
+    assert reference_ttl(now - timedelta(days=30), now, 60, 3600) == timedelta(seconds=3600)
+
+
+def test_concurrent_lookups_share_one_fetch() -> None:
+    source = StaticPriceSource("geizhals", {1: 499.0, 2: 899.0}, latency=0.05)
+    prices = service(source)
+
+    async def scenario() -> list[dict]:
+        return await asyncio.gather(*(prices.get_many([1, 2]) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert source.calls == 1
+    assert all(result == {(1, "geizhals"): 499.0, (2, "geizhals"): 899.0} for result in results)
+
+
+def test_cached_price_is_reused_until_it_expires() -> None:
+    source = StaticPriceSource("geizhals", {1: 499.0})
+
+    async def lookups(prices: ReferencePriceService) -> None:
+        await prices.get(1, "geizhals")
+        await prices.get(1, "geizhals")
+
+    asyncio.run(lookups(service(source)))
+    assert source.calls == 1
+
+    asyncio.run(lookups(service(source, min_ttl=0, max_ttl=0)))
+    assert source.calls == 3
+
+
+def test_missing_quote_keeps_previous_price() -> None:
+    source = StaticPriceSource("geizhals", {1: 499.0})
+    prices = service(source, min_ttl=0, max_ttl=0)
+
+    async def scenario() -> float | None:
+        await prices.get(1, "geizhals")
+        source.prices.clear()
+        return await prices.get(1, "geizhals")
+
+    assert asyncio.run(scenario()) == 499.0
+    assert source.calls == 2
+
+
+def test_timeout_falls_back_to_stale_price_and_fetch_completes() -> None:
+    source = StaticPriceSource("geizhals", {1: 549.0, 2: 899.0}, latency=0.2)
+    prices = service(source)
+    prices._cache[(1, "geizhals")] = cached(499.0)
+
+    async def scenario() -> tuple[dict, dict]:
+        fallback = await prices.get_many([1, 2], timeout=0.01)
+        await asyncio.sleep(0.3)
+        return fallback, await prices.get_many([1, 2], timeout=0.01)
+
+    fallback, refreshed = asyncio.run(scenario())
+    assert fallback == {(1, "geizhals"): 499.0, (2, "geizhals"): None}
+    assert refreshed == {(1, "geizhals"): 549.0, (2, "geizhals"): 899.0}
+    assert source.calls == 1
+
+
+def test_fetched_url_is_kept_in_cache() -> None:
+    prices = service(LinkedPriceSource({1: 499.0}))
+
+    asyncio.run(prices.get(1, "geizhals"))
+    assert prices._cache[(1, "geizhals")].url == "https://example.org/1"
+
+
+def test_store_writes_urls_and_recomputes_only_repriced_products() -> None:
+    log: list = []
+    prices = service(StaticPriceSource("geizhals", {}), session_factory=lambda: FakeSession(log))
+    stored = {
+        (2, "geizhals"): cached(899.0, url="https://example.org/2"),
+        (3, "geizhals"): cached(299.0, url="https://example.org/3-old"),
+        (4, "geizhals"): cached(199.0, url="https://example.org/4"),
+    }
+    entries = {
+        (1, "geizhals"): cached(499.0, url="https://example.org/1"),
+        (2, "geizhals"): cached(849.0, url="https://example.org/2"),
+        (3, "geizhals"): cached(299.0, url="https://example.org/3"),
+        (4, "geizhals"): cached(199.0, url="https://example.org/4"),
+        (5, "geizhals"): cached(None),
+    }
+
+    asyncio.run(prices._store(entries, stored))
+
+    inserts = [params for stmt, params in log if isinstance(stmt, Insert)]
+    updates = [params for stmt, params in log if isinstance(stmt, Update)]
+    assert [[row["product_id"], row["url"]] for row in inserts[0]] == [[1, "https://example.org/1"]]
+    changed, checked = updates
+    assert {row["b_product_id"]: row["url"] for row in changed} == {
+        2: "https://example.org/2",
+        3: "https://example.org/3",
+    }
+    assert [set(row) for row in checked] == [{"b_product_id", "b_source", "checked_at"}]
+    assert [stmt for stmt, _ in log].count("recompute_margins") == 1
@@ -0,0 +1,36 @@
+"""Dashboard-Statistiken ohne Datenbank: Fallback, wenn Redis fehlt oder ausfällt.
+
+Aufruf aus dem backend-Verzeichnis:
+    python -m pytest tests
+"""
+
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.schemas import StatsOut
+from app.services import stats
+
+
+class BrokenRedis:
+    async def get(self, key: str) -> None:
+        raise ConnectionError("Connection refused")
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        raise ConnectionError("Connection refused")
+
+
+@pytest.fixture(autouse=True)
+def fake_views(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def load_stats(session) -> StatsOut:
+        return StatsOut(status_counts={"new": 3}, products=[], daily_new_offers=[])
+
+    monkeypatch.setattr(stats, "load_stats", load_stats)
+
+
+@pytest.mark.parametrize("redis", [None, BrokenRedis()])
+def test_stats_fall_back_to_views(redis: BrokenRedis | None) -> None:
+    result = asyncio.run(stats.get_cached_stats(None, redis))
+
+    assert result["status_counts"] == {"new": 3}
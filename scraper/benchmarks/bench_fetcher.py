@@ -0,0 +1,70 @@
+"""Durchsatz der Fetch-Engine (Seiten/s) gegen einen lokalen Fixture-HTTP-Server.
+
+Aufruf aus dem scraper-Verzeichnis:
+    python -m benchmarks.bench_fetcher --pages 400 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fetcher import Fetcher
+
+
+PAGE = b"<html><body>" + b"<article class='aditem'>listing</article>" * 25 + b"</body></html>"
+
+
+def start_fixture_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-Alive
+
+        def do_GET(self) -> None:
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run(base_url: str, pages: int, concurrency: int) -> float:
+    async with Fetcher(
+        concurrency=concurrency,
+        rate_per_host=1_000_000,
+        burst=concurrency,
+        http2=False,  # Der Fixture-Server spricht nur HTTP/1.1
+    ) as fetcher:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(fetcher.get(f"{base_url}/s/seite:{page}") for page in range(pages)))
+        return pages / (time.perf_counter() - started_at)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    server = start_fixture_server(args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for concurrency in args.concurrency:
+            pages_per_second = asyncio.run(run(base_url, args.pages, concurrency))
+            print(f"concurrency={concurrency:>3}  {pages_per_second:8.1f} pages/s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Durchsatz des Titel-Matchers mit synthetischem Katalog.
+
+Aufruf aus dem scraper-Verzeichnis:
+    python -m benchmarks.bench_matcher --products 1000 --titles 100000
+"""
+
+import argparse
+import random
+import time
+
+from matcher import ProductMatcher
+
+
+BRANDS = ["asus", "msi", "gigabyte", "zotac", "apple", "samsung", "sony", "lenovo", "dell", "hp"]
+FAMILIES = ["rtx", "gtx", "rx", "iphone", "galaxy", "playstation", "thinkpad", "xps", "ryzen", "core"]
+WORDS = ["gaming", "oc", "edition", "neu", "ovp", "gebraucht", "top", "zustand", "defekt", "pro", "max", "mini"]
+
+
+def build_products(count: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "id": product_id,
+            "name": (name := f"{rng.choice(FAMILIES)} {1000 + product_id}"),
+            "brands": rng.sample(BRANDS, 2),
+            # Nur Produkte mit Query werden indiziert und global zugeordnet
+            "filters": {"query": name, "exclude": ["defekt"]},
+            "price_min": 50.0,
+            "price_max": 1500.0,
+            "updated_at": "2024-01-01T00:00:00",
+        }
+        for product_id in range(count)
+    ]
+
+
+def build_titles(count: int, products: list[dict], rng: random.Random) -> list[dict]:
+    listings = []
+    for _ in range(count):
+        product = rng.choice(products)
+        words = [rng.choice(product["brands"]), product["name"], *rng.sample(WORDS, 4)]
+        rng.shuffle(words)
+        listings.append({"title": " ".join(words), "price": rng.uniform(10, 2000)})
+    return listings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--titles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    products = build_products(args.products, rng)
+    listings = build_titles(args.titles, products, rng)
+
+    started_at = time.perf_counter()
+    matcher = ProductMatcher(products)
+    build_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    matches = matcher.match_many(listings)
+    match_seconds = time.perf_counter() - started_at
+
+    matched = sum(product_id is not None for product_id in matches)
+    print(f"build:  {build_seconds * 1000:.1f} ms for {args.products} products")
+    print(
+        f"match:  {match_seconds:.2f} s for {args.titles} titles "
+        f"({args.titles / match_seconds:,.0f} titles/s, {matched} matched)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Parse-Zeit und Peak-Speicher pro Seite: lxml-Streaming-Parser vs. BeautifulSoup.
+
+Aufruf aus dem scraper-Verzeichnis:
+    python -m benchmarks.bench_parser --repeat 50
+
+Peak-Speicher wird per tracemalloc gemessen und erfasst nur Python-Allokationen
+(libxml2-intern allokierter Speicher ist nicht enthalten).
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from parser import iter_listings_bs4, iter_listings_lxml
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+BASE_URL = "https://www.kleinanzeigen.de"
+
+Parser = Callable[[bytes, str], Iterator[dict[str, Any]]]
+
+
+def measure(parse: Parser, html: bytes, repeat: int) -> tuple[float, float, int]:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        count = sum(1 for _ in parse(html, BASE_URL))
+        timings.append(time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    sum(1 for _ in parse(html, BASE_URL))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 1024, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'fixture':<32} {'parser':<6} {'listings':>8} {'ms/page':>9} {'peak KiB':>9}")
+    for path in sorted(FIXTURES_DIR.glob("*.html")):
+        html = path.read_bytes()
+        for name, parse in (("lxml", iter_listings_lxml), ("bs4", iter_listings_bs4)):
+            ms, peak_kib, count = measure(parse, html, args.repeat)
+            print(f"{path.name:<32} {name:<6} {count:>8} {ms:>9.2f} {peak_kib:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+import httpx
+import structlog
+from redis.asyncio import Redis
+
+from matcher import ProductMatcher
+
+
+logger = structlog.get_logger(__name__)
+
+# Gemeinsame Redis-Keys mit backend/app/services/versions.py
+PRODUCTS_VERSION_KEY = "version:products"
+CATALOG_CHANNEL = "catalog:products"
+
+# Fallback, falls eine Pub/Sub-Nachricht verloren geht (z.B. während eines Reconnects)
+CATALOG_POLL_SECONDS = 30
+RECONNECT_SECONDS = 5
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """Unveränderlicher Stand der aktiven Produkte samt vorkompiliertem Matcher."""
+
+    version: int
+    products: Mapping[int, Mapping[str, Any]]
+    matcher: ProductMatcher
+
+
+EMPTY_SNAPSHOT = CatalogSnapshot(version=-1, products=MappingProxyType({}), matcher=ProductMatcher([]))
+
+
+class ProductCatalog:
+    """Produktkatalog pro Prozess, geladen einmal pro Version statt pro Crawl-Zyklus.
+
+    Das Backend erhöht bei jeder Produktänderung `version:products` und meldet die neue
+    Version auf `catalog:products`. Neu geladen wird komplett in einen neuen Snapshot, der
+    erst danach die Referenz ersetzt: Leser sehen immer einen vollständigen Stand.
+    """
+
+    def __init__(self, backend: httpx.AsyncClient, redis: Redis) -> None:
+        self.backend = backend
+        self.redis = redis
+        self._snapshot = EMPTY_SNAPSHOT
+        self._lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    async def current(self) -> CatalogSnapshot:
+        """Aktueller Snapshot; lädt beim ersten Aufruf (bzw. nach einem fehlgeschlagenen Start)."""
+        if self._snapshot is EMPTY_SNAPSHOT:
+            await self.reload()
+        return self._snapshot
+
+    async def reload(self, min_version: int | None = None) -> CatalogSnapshot:
+        async with self._lock:
+            # Ein paralleler Reload kann die gemeldete Version schon geladen haben
+            if min_version is not None and self._snapshot.version >= min_version:
+                return self._snapshot
+
+            # Version vor den Daten lesen: eine Änderung dazwischen löst einen weiteren Reload aus.
+            # /api/products liest von der Primary, eine nachlaufende Replica kann den Stand
+            # also nicht hinter die gespeicherte Version zurückfallen lassen
+            version = int(await self.redis.get(PRODUCTS_VERSION_KEY) or 0)
+            response = await self.backend.get("/api/products")
+            response.raise_for_status()
+            products = [product for product in response.json() if product["active"]]
+
+            self._snapshot = CatalogSnapshot(
+                version=version,
+                products=MappingProxyType(
+                    {product["id"]: MappingProxyType(product) for product in products}
+                ),
+                matcher=ProductMatcher(products),
+            )
+        logger.info("catalog_loaded", version=version, products=len(products))
+        return self._snapshot
+
+    async def run(self) -> None:
+        """Lausche auf Versionsmeldungen und lade bei neuerer Version nach."""
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(CATALOG_CHANNEL)
+                    # Änderungen während der Verbindungslücke nachholen
+                    await self._reload_if_changed()
+                    while True:
+                        message = await pubsub.get_message(timeout=CATALOG_POLL_SECONDS)
+                        if message is None:
+                            await self._reload_if_changed()
+                        elif int(message["data"]) > self._snapshot.version:
+                            await self.reload(min_version=int(message["data"]))
+            except Exception as e:
+                logger.error("catalog_listener_failed", error=str(e))
+                await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def _reload_if_changed(self) -> None:
+        version = int(await self.redis.get(PRODUCTS_VERSION_KEY) or 0)
+        if version != self._snapshot.version:
+            await self.reload()
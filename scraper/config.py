@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    redis_url: str = "redis://redis:6379/0"
+    # Scraper spricht ausschließlich über die REST-API mit dem Backend
+    backend_url: str = "http://backend:8000"
+
+    search_base_url: str = "https://www.kleinanzeigen.de"
+    user_agent: str = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)"
+
+    # Fetch-Engine
+    scraper_concurrency: int = 8
+    scraper_http2: bool = True
+    scraper_rate_per_host: float = 2.0  # Requests pro Sekunde und Host
+    scraper_burst: int = 4
+    scraper_max_retries: int = 3
+    scraper_timeout: float = 20.0
+
+    # Crawl-Zyklus
+    scraper_max_pages: int = 5
+    # Basisintervall pro Produkt; der Scheduler verkürzt es nach Ertrag bzw. verlängert es per Backoff
+    scraper_cycle_interval: int = 300
+    scraper_min_interval: int = 60
+    scraper_max_interval: int = 6 * 3600
+    # Lease pro Produkt-Crawl über alle Scraper-Container; muss länger sein als ein Crawl dauert
+    scraper_lease_seconds: int = 600
+
+    # Liveness-Re-Check veralteter Angebote (Alter gemäß OFFER_STALE_HOURS im Backend)
+    scraper_recheck_batch: int = 200
+    scraper_recheck_concurrency: int = 4
+    scraper_recheck_interval: int = 60
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+
+from redis.asyncio import Redis
+
+
+# Gemeinsame Redis-Keys mit backend/app/api/scraper.py
+DESIRED_STATE_KEY = "scraper:desired_state"
+STATUS_KEY = "scraper:status"
+
+# Ohne Heartbeat verschwindet der Status, das Backend meldet dann "offline"
+STATUS_TTL_SECONDS = 120
+
+
+class ScraperControl:
+    """Start/Stop-Flag und Live-Status des Scrapers in Redis."""
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def should_run(self) -> bool:
+        return await self.redis.get(DESIRED_STATE_KEY) == "running"
+
+    async def report_stats(self, **stats: int | float | str) -> None:
+        """Ergänze Kennzahlen im Status, ohne den Zustand zu überschreiben."""
+        await self.redis.hset(STATUS_KEY, mapping=stats)
+
+    async def report(self, state: str, **stats: int | float | str) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(STATUS_KEY, mapping={"state": state, "heartbeat_at": now, **stats})
+            pipe.expire(STATUS_KEY, STATUS_TTL_SECONDS)
+            await pipe.execute()
@@ -0,0 +1,221 @@
+import asyncio
+import re
+import time
+from collections.abc import Mapping
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+import structlog
+
+from catalog import ProductCatalog
+from config import Settings
+from control import ScraperControl
+from fetcher import Fetcher
+from matcher import ProductMatcher
+from page_cache import CrawlCache, PageState, content_hash
+from parser import iter_listings
+from scheduler import CrawlScheduler, CrawlYield
+
+
+logger = structlog.get_logger(__name__)
+
+# Maximale Anzahl Angebote pro POST /api/offers/bulk bzw. /api/offers/touch
+INGEST_BATCH_SIZE = 1000
+
+
+def _slug(text: str) -> str:
+    return quote(re.sub(r"\s+", "-", text.strip().lower()))
+
+
+def build_search_url(base_url: str, product: Mapping[str, Any], page: int) -> str:
+    """Baue die Kleinanzeigen-Such-URL aus Suchbegriff, Preisfenster und Kategorie.
+
+    Unterstützte `filters`: `query` (Suchbegriff statt Produktname), `category` (z.B. "c225").
+    """
+    filters = product.get("filters") or {}
+    query = filters.get("query") or product["name"]
+    price = f"s-preis:{int(product['price_min'])}:{int(product['price_max'])}"
+    page_part = f"/seite:{page}" if page > 1 else ""
+    return f"{base_url}/{price}{page_part}/{_slug(query)}/k0{filters.get('category', '')}"
+
+
+class Crawler:
+    """Läuft die Suchseiten fälliger Produkte ab und schreibt Treffer per Bulk-Upsert ins Backend.
+
+    Welche Produkte fällig sind, entscheidet der `CrawlScheduler` anhand ihres Ertrags;
+    Produkte und Matcher kommen aus dem `ProductCatalog`-Snapshot, nicht pro Zyklus vom Backend.
+
+    Seiten werden per ETag/Last-Modified bedingt abgerufen. Bei 304 oder gleichem Content-Hash
+    entfallen Parsing und Upsert, ebenso für Anzeigen mit unverändertem Datensatz-Hash;
+    für diese wird nur `last_checked_at` gesammelt aktualisiert.
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        backend: httpx.AsyncClient,
+        control: ScraperControl,
+        cache: CrawlCache,
+        scheduler: CrawlScheduler,
+        catalog: ProductCatalog,
+        settings: Settings,
+    ) -> None:
+        self.fetcher = fetcher
+        self.backend = backend
+        self.control = control
+        self.cache = cache
+        self.scheduler = scheduler
+        self.catalog = catalog
+        self.settings = settings
+        self.cycle = 0
+        self.pages_fetched = 0
+        self.pages_unchanged = 0
+        self.listings_found = 0
+        self.listings_unchanged = 0
+        self.matcher = ProductMatcher([])
+
+    async def run_cycle(self) -> int:
+        """Crawle die aktuell fälligen Produkte, für die dieser Worker eine Lease bekommt.
+
+        Gibt die Anzahl gecrawlter Produkte zurück (0 = nichts fällig).
+        """
+        # Ein Snapshot pro Zyklus: ein Reload währenddessen ändert laufende Crawls nicht
+        snapshot = await self.catalog.current()
+        products = snapshot.products
+        await self.scheduler.sync(products)
+        product_ids = await self.scheduler.claim(self.settings.scraper_concurrency)
+        if not product_ids:
+            return 0
+
+        self.cycle += 1
+        started_at = time.monotonic()
+        pages_before = self.pages_fetched
+        self.matcher = snapshot.matcher
+
+        # Parallelität und Rate-Limit regelt der Fetcher
+        results = await asyncio.gather(
+            *(self.crawl_product(products[product_id]) for product_id in product_ids),
+            return_exceptions=True,
+        )
+        for product_id, result in zip(product_ids, results):
+            if isinstance(result, Exception):
+                logger.error("crawl_product_failed", product_id=product_id, error=str(result))
+                result = None
+            interval = await self.scheduler.complete(product_id, result)
+            logger.debug("product_rescheduled", product_id=product_id, seconds=round(interval))
+
+        elapsed = time.monotonic() - started_at
+        pages = self.pages_fetched - pages_before
+        logger.info("crawl_cycle_finished", cycle=self.cycle, products=len(product_ids), pages=pages, seconds=round(elapsed, 2))
+        await self.report("idle", pages_per_second=round(pages / elapsed, 2) if elapsed else 0)
+        return len(product_ids)
+
+    async def crawl_product(self, product: Mapping[str, Any]) -> CrawlYield:
+        """Crawle die Suchseiten eines Produkts und gib den Ertrag für den Scheduler zurück.
+
+        Treffer werden über den Matcher zugeordnet und können so auch einem anderen
+        Produkt als dem gesuchten gehören; nicht zuordenbare Anzeigen werden verworfen.
+        Produkte ohne `filters.query` bekommen nur Treffer ihrer eigenen Suchseite.
+        """
+        records: list[dict[str, Any]] = []
+        unchanged_urls: list[str] = []
+        for page in range(1, self.settings.scraper_max_pages + 1):
+            if not await self.control.should_run():
+                break
+
+            url = build_search_url(self.settings.search_base_url, product, page)
+            cached = await self.cache.get_page(url)
+            response = await self.fetcher.get(
+                url, headers=cached.conditional_headers() if cached else None
+            )
+            if response.status_code == 304 and cached:
+                state = cached
+            else:
+                response.raise_for_status()
+                state = await self._process_page(url, response, cached, product["id"], records)
+            self.pages_fetched += 1
+
+            if state is cached:
+                self.pages_unchanged += 1
+                unchanged_urls.extend(cached.listing_urls)
+            if not state.listings:
+                break
+            await self.report("running", current_product_id=product["id"])
+
+        changed, unchanged = await self.cache.split_changed(records)
+        unchanged_urls.extend(unchanged)
+        self.listings_found += len(records)
+        self.listings_unchanged += len(unchanged_urls)
+
+        crawl = await self.ingest(changed)
+        await self.cache.remember(changed)
+        await self.touch(unchanged_urls)
+        return crawl
+
+    async def _process_page(
+        self,
+        url: str,
+        response: httpx.Response,
+        cached: PageState | None,
+        product_id: int,
+        records: list[dict[str, Any]],
+    ) -> PageState:
+        """Parse eine geänderte Seite; bei gleichem Content-Hash wird der Cache-Eintrag zurückgegeben."""
+        digest = content_hash(response.content)
+        if cached and cached.content_hash == digest:
+            return cached
+
+        listings = 0
+        matched = []
+        for listing in iter_listings(response.content, self.settings.search_base_url):
+            listings += 1
+            matched_id = self.matcher.match(listing["title"], listing["price"], product_id)
+            if matched_id is not None:
+                matched.append({**listing, "product_id": matched_id})
+        records.extend(matched)
+
+        state = PageState(
+            content_hash=digest,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            listings=listings,
+            listing_urls=[record["url"] for record in matched],
+        )
+        await self.cache.set_page(url, state)
+        return state
+
+    async def ingest(self, records: list[dict[str, Any]]) -> CrawlYield:
+        crawl = CrawlYield()
+        for start in range(0, len(records), INGEST_BATCH_SIZE):
+            response = await self.backend.post(
+                "/api/offers/bulk", json={"offers": records[start : start + INGEST_BATCH_SIZE]}
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.info("offers_ingested", **result)
+            crawl.created += result["created"]
+            crawl.changed += result["created"] + result["updated"]
+            crawl.above_threshold += result["above_threshold"]
+        return crawl
+
+    async def touch(self, urls: list[str]) -> None:
+        for start in range(0, len(urls), INGEST_BATCH_SIZE):
+            response = await self.backend.post(
+                "/api/offers/touch", json={"urls": urls[start : start + INGEST_BATCH_SIZE]}
+            )
+            response.raise_for_status()
+
+    async def report(self, state: str, **extra: int | float | str) -> None:
+        await self.control.report(
+            state,
+            cycle=self.cycle,
+            pages_fetched=self.pages_fetched,
+            pages_unchanged=self.pages_unchanged,
+            listings_found=self.listings_found,
+            listings_unchanged=self.listings_unchanged,
+            requests=self.fetcher.stats.requests,
+            retries=self.fetcher.stats.retries,
+            errors=self.fetcher.stats.errors,
+            **extra,
+        )
@@ -0,0 +1,150 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Token-Bucket: im Mittel `rate` Requests pro Sekunde, Bursts bis `capacity`."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # Der Lock sorgt dafür, dass Wartende in Ankunftsreihenfolge bedient werden
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class FetchStats:
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    bytes_received: int = 0
+
+
+class Fetcher:
+    """HTTP-Fetch-Engine auf Basis eines geteilten `httpx.AsyncClient`.
+
+    - Keep-Alive-Pooling (optional HTTP/2) über einen Client für alle Requests
+    - globale Obergrenze paralleler Requests per Semaphore
+    - Token-Bucket-Rate-Limit pro Host
+    - Retries mit exponentiellem Backoff und Full Jitter (Retry-After wird beachtet)
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 8,
+        rate_per_host: float = 2.0,
+        burst: int = 4,
+        max_retries: int = 3,
+        timeout: float = 20.0,
+        http2: bool = True,
+        user_agent: str | None = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = FetchStats()
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=timeout,
+            follow_redirects=True,
+            headers={"User-Agent": user_agent} if user_agent else None,
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+                keepalive_expiry=30.0,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "Fetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return bucket
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def get(self, url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        return await self.request("GET", url, headers)
+
+    async def head(self, url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        return await self.request("HEAD", url, headers)
+
+    async def request(
+        self, method: str, url: str, headers: dict[str, str] | None = None
+    ) -> httpx.Response:
+        """Request mit Rate-Limit und Retries.
+
+        Nach dem letzten Versuch wird eine Antwort mit Retry-Statuscode zurückgegeben
+        bzw. der letzte Transportfehler weitergereicht.
+        """
+        bucket = self._bucket(url)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            retry_after = None
+            async with self._semaphore:
+                self.stats.requests += 1
+                try:
+                    response = await self._client.request(method, url, headers=headers)
+                except httpx.TransportError as e:
+                    self.stats.errors += 1
+                    if attempt == self.max_retries:
+                        raise
+                    logger.warning("fetch_retry", url=url, attempt=attempt, error=str(e))
+                else:
+                    self.stats.bytes_received += len(response.content)
+                    if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                        return response
+                    retry_after = response.headers.get("Retry-After")
+                    logger.warning("fetch_retry", url=url, attempt=attempt, status=response.status_code)
+
+            self.stats.retries += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        raise AssertionError("unreachable")
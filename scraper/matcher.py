@@ -0,0 +1,110 @@
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Kleinbuchstaben-Tokens; Buchstaben und Ziffern werden getrennt ("RTX3080" -> rtx, 3080)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def matches_product(title: str, price: float, product: Mapping[str, Any]) -> bool:
+    """Nachfilter für Suchtreffer von Produkten ohne `filters.query`: Preisfenster, Marken, `exclude`.
+
+    Den Namen prüft hier die Kleinanzeigen-Suche; Marken und Ausschlusswörter als Teilstring.
+    """
+    if not product["price_min"] <= price <= product["price_max"]:
+        return False
+    title = title.lower()
+    brands = product.get("brands") or []
+    if brands and not any(brand.lower() in title for brand in brands):
+        return False
+    excluded = (product.get("filters") or {}).get("exclude") or []
+    return not any(word.lower() in title for word in excluded)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledProduct:
+    id: int
+    # Tokens aus `filters.query`; ohne Query leer, das Produkt wird dann nicht indiziert
+    required: frozenset[str]
+    # Jede Marke bzw. jedes Ausschlusswort kann aus mehreren Tokens bestehen
+    brands: tuple[frozenset[str], ...]
+    excluded: tuple[frozenset[str], ...]
+    price_min: float
+    price_max: float
+
+    @classmethod
+    def from_product(cls, product: Mapping[str, Any]) -> "CompiledProduct":
+        filters = product.get("filters") or {}
+        return cls(
+            id=product["id"],
+            required=frozenset(tokenize(filters.get("query") or "")),
+            brands=tuple(
+                frozenset(tokenize(brand)) for brand in product.get("brands") or [] if tokenize(brand)
+            ),
+            excluded=tuple(
+                frozenset(tokenize(word)) for word in filters.get("exclude") or [] if tokenize(word)
+            ),
+            price_min=product["price_min"],
+            price_max=product["price_max"],
+        )
+
+    def matches(self, tokens: set[str], price: float) -> bool:
+        return (
+            self.price_min <= price <= self.price_max
+            and self.required <= tokens
+            and (not self.brands or any(brand <= tokens for brand in self.brands))
+            and not any(word <= tokens for word in self.excluded)
+        )
+
+
+class ProductMatcher:
+    """Ordnet Anzeigentitel über einen invertierten Token-Index einem Produkt zu.
+
+    Pflicht-Tokens sind die Tokens aus `filters.query`. Jedes Produkt wird nur unter seinem
+    seltensten Pflicht-Token indiziert. Ein Titel prüft damit nur die Produkte, deren
+    Anker-Token er enthält, statt aller Produkte; der Aufwand ist linear in der Titellänge
+    plus der (kleinen) Kandidatenzahl. Bei mehreren Treffern gewinnt das spezifischste
+    Produkt (meiste Pflicht-Tokens).
+
+    Produkte ohne Query werden wie bisher nur auf ihrer eigenen Suchseite zugeordnet
+    (`searched_product_id`, Prüfung per `matches_product`), wenn kein indiziertes passt.
+    """
+
+    def __init__(self, products: Iterable[Mapping[str, Any]]) -> None:
+        products = list(products)
+        self._without_query = {
+            product["id"]: product for product in products if not (product.get("filters") or {}).get("query")
+        }
+        compiled = [CompiledProduct.from_product(product) for product in products]
+        document_frequency = Counter(token for product in compiled for token in product.required)
+        self._index: dict[str, list[CompiledProduct]] = defaultdict(list)
+        for product in compiled:
+            if product.required:
+                anchor = min(product.required, key=lambda token: (document_frequency[token], token))
+                self._index[anchor].append(product)
+
+    def match(self, title: str, price: float, searched_product_id: int | None = None) -> int | None:
+        tokens = set(tokenize(title))
+        best: CompiledProduct | None = None
+        for token in tokens:
+            for product in self._index.get(token, ()):
+                if (best is None or len(product.required) > len(best.required)) and product.matches(
+                    tokens, price
+                ):
+                    best = product
+        if best is not None:
+            return best.id
+        searched = self._without_query.get(searched_product_id)
+        return searched_product_id if searched and matches_product(title, price, searched) else None
+
+    def match_many(
+        self, listings: Iterable[dict[str, Any]], searched_product_id: int | None = None
+    ) -> list[int | None]:
+        return [self.match(listing["title"], listing["price"], searched_product_id) for listing in listings]
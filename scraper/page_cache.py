@@ -0,0 +1,93 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+PAGE_KEY_PREFIX = "scraper:page:"
+# Pro Offer-URL: Hash des zuletzt ans Backend geschriebenen Datensatzes
+OFFER_HASH_KEY_PREFIX = "scraper:offer_hash:"
+
+# Validatoren ungesehener Seiten und Angebote verfallen nach einer Woche
+PAGE_TTL_SECONDS = 7 * 24 * 3600
+
+
+def content_hash(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def record_hash(record: dict[str, Any]) -> str:
+    return content_hash(json.dumps(record, sort_keys=True, ensure_ascii=False))
+
+
+@dataclass
+class PageState:
+    """Validatoren und Ergebnis des letzten Abrufs einer Suchseite."""
+
+    content_hash: str
+    etag: str | None = None
+    last_modified: str | None = None
+    # Anzahl Anzeigen vor dem Produkt-Nachfilter (0 = Ende der Ergebnisliste)
+    listings: int = 0
+    listing_urls: list[str] = field(default_factory=list)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class CrawlCache:
+    """Redis-Cache für inkrementelles Crawlen (ETag/Last-Modified und Content-Hashes)."""
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def get_page(self, url: str) -> PageState | None:
+        raw = await self.redis.get(PAGE_KEY_PREFIX + content_hash(url))
+        return PageState(**json.loads(raw)) if raw else None
+
+    async def set_page(self, url: str, state: PageState) -> None:
+        await self.redis.set(
+            PAGE_KEY_PREFIX + content_hash(url), json.dumps(asdict(state)), ex=PAGE_TTL_SECONDS
+        )
+
+    async def split_changed(
+        self, records: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[str]]:
+        """Teile Datensätze in geänderte/neue und unveränderte (nur URLs) auf."""
+        if not records:
+            return [], []
+        keys = [_offer_hash_key(record["url"]) for record in records]
+        known = await self.redis.mget(keys)
+        changed, unchanged_urls = [], []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for record, key, known_hash in zip(records, keys, known):
+                if known_hash == record_hash(record):
+                    unchanged_urls.append(record["url"])
+                    # Wiedergefundene Angebote bleiben im Cache
+                    pipe.expire(key, PAGE_TTL_SECONDS)
+                else:
+                    changed.append(record)
+            if unchanged_urls:
+                await pipe.execute()
+        return changed, unchanged_urls
+
+    async def remember(self, records: list[dict[str, Any]]) -> None:
+        if not records:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for record in records:
+                pipe.set(_offer_hash_key(record["url"]), record_hash(record), ex=PAGE_TTL_SECONDS)
+            await pipe.execute()
+
+
+def _offer_hash_key(url: str) -> str:
+    return OFFER_HASH_KEY_PREFIX + content_hash(url)
@@ -0,0 +1,139 @@
+import re
+from collections.abc import Iterator
+from io import BytesIO
+from typing import Any
+from urllib.parse import urljoin
+
+import structlog
+from bs4 import BeautifulSoup
+from lxml import etree
+
+
+logger = structlog.get_logger(__name__)
+
+_PRICE_RE = re.compile(r"(\d{1,3}(?:\.\d{3})*|\d+)(?:,(\d{1,2}))?")
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Vorkompilierte XPath-Ausdrücke relativ zu einem <article class="aditem">
+_XP_TITLE = etree.XPath(f"string((.//h2//a | .//*[{_has_class('text-module-begin')}]//a)[1])")
+_XP_PRICE = etree.XPath(f"string((.//*[{_has_class('aditem-main--middle--price-shipping--price')}])[1])")
+_XP_IMAGE = etree.XPath(f"string((.//*[{_has_class('imagebox')}]//img/@src)[1])")
+_XP_LOCATION = etree.XPath(f"string((.//*[{_has_class('aditem-main--top--left')}])[1])")
+_XP_DESCRIPTION = etree.XPath(f"string((.//*[{_has_class('aditem-main--middle--description')}])[1])")
+
+
+def parse_price(text: str | None) -> float | None:
+    """Parse Preise wie "1.234 € VB" oder "99,50 €"; "Zu verschenken" o.ä. ergibt None."""
+    if not text:
+        return None
+    match = _PRICE_RE.search(text)
+    if not match:
+        return None
+    euros, cents = match.groups()
+    return float(f"{euros.replace('.', '')}.{cents or '0'}")
+
+
+def _clean(text: str | None) -> str | None:
+    if not text:
+        return None
+    return " ".join(text.split()) or None
+
+
+def _record(
+    href: str | None,
+    title: str | None,
+    price_text: str | None,
+    image_url: str | None,
+    location: str | None,
+    description: str | None,
+    base_url: str,
+) -> dict[str, Any] | None:
+    title = _clean(title)
+    price = parse_price(price_text)
+    if not href or not title or price is None:
+        return None
+    return {
+        "title": title[:255],
+        "price": price,
+        "url": urljoin(base_url, href),
+        "image_url": image_url or None,
+        "seller_name": None,
+        "location": _clean(location),
+        "description": _clean(description),
+    }
+
+
+def iter_listings_lxml(html: bytes, base_url: str) -> Iterator[dict[str, Any]]:
+    """Streame die Anzeigen per lxml-`iterparse`; verarbeitete Knoten werden sofort freigegeben."""
+    for _, article in etree.iterparse(BytesIO(html), events=("end",), tag="article", html=True):
+        if "aditem" in (article.get("class") or "").split():
+            record = _record(
+                article.get("data-href"),
+                _XP_TITLE(article),
+                _XP_PRICE(article),
+                _XP_IMAGE(article),
+                _XP_LOCATION(article),
+                _XP_DESCRIPTION(article),
+                base_url,
+            )
+            if record:
+                yield record
+
+        article.clear()
+        while article.getprevious() is not None:
+            del article.getparent()[0]
+
+
+def iter_listings_bs4(html: bytes, base_url: str) -> Iterator[dict[str, Any]]:
+    """Fallback für HTML, an dem lxml scheitert; toleranter, aber deutlich langsamer."""
+
+    def text(node) -> str | None:
+        return node.get_text(" ", strip=True) if node is not None else None
+
+    soup = BeautifulSoup(html, "html.parser")
+    for article in soup.select("article.aditem"):
+        image = article.select_one(".imagebox img")
+        record = _record(
+            article.get("data-href"),
+            text(article.select_one("h2 a, .text-module-begin a")),
+            text(article.select_one(".aditem-main--middle--price-shipping--price")),
+            image.get("src") if image else None,
+            text(article.select_one(".aditem-main--top--left")),
+            text(article.select_one(".aditem-main--middle--description")),
+            base_url,
+        )
+        if record:
+            yield record
+
+
+def iter_listings(html: bytes | str, base_url: str) -> Iterator[dict[str, Any]]:
+    """Extrahiere die Anzeigen einer Suchergebnisseite als `OfferCreate`-artige Dicts (ohne product_id).
+
+    Primär lxml; liefert lxml bei einer Seite mit Anzeigen-Markup nichts oder bricht ab,
+    wird die Seite mit BeautifulSoup erneut geparst.
+    """
+    if isinstance(html, str):
+        html = html.encode()
+
+    yielded = 0
+    try:
+        for record in iter_listings_lxml(html, base_url):
+            yielded += 1
+            yield record
+    except etree.LxmlError as e:
+        logger.warning("lxml_parse_failed", error=str(e))
+    else:
+        if yielded or b"aditem" not in html:
+            return
+
+    # Bereits gelieferte Datensätze nicht doppelt ausgeben
+    for record in iter_listings_bs4(html, base_url):
+        if yielded:
+            yielded -= 1
+            continue
+        yield record
+
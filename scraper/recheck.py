@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+from redis.asyncio import Redis
+
+from config import Settings
+from control import ScraperControl
+from fetcher import Fetcher
+
+
+logger = structlog.get_logger(__name__)
+
+# Nur ein Scraper-Container prüft gleichzeitig, sonst würden dieselben Angebote doppelt abgefragt
+RECHECK_LOCK_KEY = "scraper:recheck:lock"
+RECHECK_LOCK_SECONDS = 600
+
+GONE_STATUS_CODES = frozenset({404, 410})
+# Server, die HEAD ablehnen, werden per GET geprüft
+HEAD_UNSUPPORTED_STATUS_CODES = frozenset({405, 501})
+
+
+class LivenessChecker:
+    """Prüft veraltete Angebote per HEAD-Request und meldet sie gesammelt ans Backend.
+
+    Gelöschte Anzeigen antworten mit 404/410 oder leiten auf eine Suchseite weiter.
+    Nicht eindeutige Antworten (5xx, 403, Timeouts) werden als `alive=None` gemeldet: das
+    Backend setzt nur `last_checked_at` weiter, sonst belegten dieselben Angebote mit hoher
+    Marge jeden Batch und alle anderen kämen nie dran.
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        backend: httpx.AsyncClient,
+        control: ScraperControl,
+        redis: Redis,
+        settings: Settings,
+    ) -> None:
+        self.fetcher = fetcher
+        self.backend = backend
+        self.control = control
+        self.redis = redis
+        self.settings = settings
+        self.rechecks = 0
+        self.expired = 0
+        self._semaphore = asyncio.Semaphore(settings.scraper_recheck_concurrency)
+
+    async def run(self) -> None:
+        while True:
+            applied = 0
+            try:
+                if await self.control.should_run():
+                    applied = await self.run_batch()
+            except Exception as e:
+                logger.error("recheck_batch_failed", error=str(e))
+            # Nur wenn das Backend einen vollen Batch übernommen hat, direkt weitermachen
+            if applied < self.settings.scraper_recheck_batch:
+                await asyncio.sleep(self.settings.scraper_recheck_interval)
+
+    async def run_batch(self) -> int:
+        """Prüfe einen Batch veralteter Angebote; gibt die Anzahl vom Backend übernommener Ergebnisse zurück."""
+        lock = self.redis.lock(RECHECK_LOCK_KEY, timeout=RECHECK_LOCK_SECONDS)
+        if not await lock.acquire(blocking=False):
+            return 0
+        try:
+            started_at = time.monotonic()
+            response = await self.backend.get(
+                "/api/offers/stale", params={"limit": self.settings.scraper_recheck_batch}
+            )
+            response.raise_for_status()
+            offers = response.json()
+            if not offers:
+                return 0
+
+            results = await asyncio.gather(*(self._check(offer) for offer in offers))
+            response = await self.backend.post("/api/offers/liveness", json={"results": results})
+            response.raise_for_status()
+            written = response.json()
+        finally:
+            await lock.release()
+
+        elapsed = time.monotonic() - started_at
+        self.rechecks += len(offers)
+        self.expired += written["expired"]
+        rate = round(len(offers) / elapsed, 2) if elapsed else 0
+        logger.info("recheck_batch_finished", offers=len(offers), rechecks_per_second=rate, **written)
+        await self.control.report_stats(
+            rechecks=self.rechecks, rechecks_expired=self.expired, rechecks_per_second=rate
+        )
+        return written["checked"]
+
+    async def _check(self, offer: dict[str, Any]) -> dict[str, Any]:
+        async with self._semaphore:
+            try:
+                response = await self.fetcher.head(offer["url"])
+                if response.status_code in HEAD_UNSUPPORTED_STATUS_CODES:
+                    response = await self.fetcher.get(offer["url"])
+            except httpx.HTTPError as e:
+                logger.warning("recheck_failed", offer_id=offer["id"], error=str(e))
+                return {"id": offer["id"], "alive": None}
+
+        return {"id": offer["id"], "alive": is_alive(offer["url"], response)}
+
+
+def is_alive(url: str, response: httpx.Response) -> bool | None:
+    """True/False für eindeutige Antworten, None wenn der Zustand unklar ist."""
+    if response.status_code in GONE_STATUS_CODES:
+        return False
+    if response.is_success:
+        # Gelöschte Anzeigen leiten auf Such- oder Kategorieseiten weiter
+        return urlsplit(str(response.url)).path.rstrip("/") == urlsplit(url).path.rstrip("/")
+    return None
@@ -0,0 +1,154 @@
+import os
+import socket
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+
+# Redis-Sorted-Set: product_id -> Zeitpunkt (Unix-Sekunden), ab dem das Produkt fällig ist
+SCHEDULE_KEY = "scraper:schedule"
+# Redis-Hash pro Produkt mit geglätteten Ertragskennzahlen
+YIELD_KEY_PREFIX = "scraper:yield:"
+LEASE_KEY_PREFIX = "scraper:lease:"
+
+# Glättungsfaktor der Ertrags-EWMAs: neuere Crawls zählen stärker
+YIELD_ALPHA = 0.3
+# Angebote über der Margen-Schwelle verdoppeln bei Anteil 1.0 den Ertrag eines Produkts
+MARGIN_SHARE_WEIGHT = 1.0
+# Obergrenze für den Backoff-Exponenten kalter Produkte
+MAX_COLD_STREAK = 10
+
+# Vergibt fällige Produkte atomar: Lease per SET NX PX, danach wird das Produkt bis zum
+# Lease-Ablauf nach hinten geschoben. Stirbt ein Worker, wird es danach wieder fällig.
+_CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2] * 4)
+local claimed = {}
+for _, member in ipairs(due) do
+    if redis.call('SET', ARGV[5] .. member, ARGV[4], 'NX', 'PX', ARGV[3]) then
+        redis.call('ZADD', KEYS[1], ARGV[1] + ARGV[3] / 1000, member)
+        table.insert(claimed, member)
+        if #claimed >= tonumber(ARGV[2]) then
+            break
+        end
+    end
+end
+return claimed
+"""
+
+# Plant neu und gibt die Lease frei, außer ein anderer Worker hält sie inzwischen (Lease abgelaufen)
+_COMPLETE_SCRIPT = """
+local holder = redis.call('GET', KEYS[2])
+if holder and holder ~= ARGV[1] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+redis.call('DEL', KEYS[2])
+return 1
+"""
+
+
+@dataclass
+class CrawlYield:
+    """Ergebnis eines Produkt-Crawls aus Sicht des Schedulers."""
+
+    created: int = 0
+    # Neue oder geänderte Angebote insgesamt und davon über der Margen-Schwelle
+    changed: int = 0
+    above_threshold: int = 0
+
+
+class CrawlScheduler:
+    """Verteilt das Fetch-Budget nach Ertrag auf die Produkte, geteilt über alle Scraper-Container.
+
+    Jedes Produkt steht mit seinem nächsten Fälligkeitszeitpunkt im Sorted Set. Das Intervall
+    schrumpft mit der geglätteten Zahl neuer Angebote pro Crawl, gewichtet mit dem Anteil über
+    der Margen-Schwelle; jeder Crawl in Folge ohne neue Angebote verdoppelt es (Backoff).
+    Überfällige Produkte werden in der Reihenfolge ihrer Wartezeit vergeben.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        lease_seconds: float,
+    ) -> None:
+        self.redis = redis
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lease_ms = int(lease_seconds * 1000)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._leases: dict[int, str] = {}
+        self._claim = redis.register_script(_CLAIM_SCRIPT)
+        self._complete = redis.register_script(_COMPLETE_SCRIPT)
+
+    async def sync(self, product_ids: Iterable[int]) -> None:
+        """Nimm neue aktive Produkte sofort fällig auf und entferne inaktive."""
+        product_ids = {str(product_id) for product_id in product_ids}
+        scheduled = set(await self.redis.zrange(SCHEDULE_KEY, 0, -1))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if new := product_ids - scheduled:
+                pipe.zadd(SCHEDULE_KEY, {member: time.time() for member in new}, nx=True)
+            if removed := scheduled - product_ids:
+                pipe.zrem(SCHEDULE_KEY, *removed)
+                pipe.delete(*(YIELD_KEY_PREFIX + member for member in removed))
+            await pipe.execute()
+
+    async def claim(self, limit: int) -> list[int]:
+        """Lease bis zu `limit` fällige Produkte für diesen Worker."""
+        token = f"{self.worker_id}:{uuid.uuid4().hex}"
+        claimed = await self._claim(
+            keys=[SCHEDULE_KEY], args=[time.time(), limit, self.lease_ms, token, LEASE_KEY_PREFIX]
+        )
+        product_ids = [int(member) for member in claimed]
+        for product_id in product_ids:
+            self._leases[product_id] = token
+        return product_ids
+
+    async def seconds_until_due(self) -> float | None:
+        head = await self.redis.zrange(SCHEDULE_KEY, 0, 0, withscores=True)
+        return max(0.0, head[0][1] - time.time()) if head else None
+
+    async def complete(self, product_id: int, crawl: CrawlYield | None) -> float:
+        """Aktualisiere den Ertrag, plane das Produkt neu ein und gib die Lease frei.
+
+        `crawl=None` (Fehler) plant nach dem Basisintervall neu, ohne den Ertrag zu verändern.
+        Gibt das neue Intervall in Sekunden zurück.
+        """
+        key = YIELD_KEY_PREFIX + str(product_id)
+        stats = {name: float(value) for name, value in (await self.redis.hgetall(key)).items()}
+        if crawl is None:
+            interval = self.base_interval
+        else:
+            stats = self._update_stats(stats, crawl)
+            interval = self.interval(stats)
+            await self.redis.hset(key, mapping={**stats, "last_crawl_at": time.time()})
+
+        token = self._leases.pop(product_id, "")
+        await self._complete(
+            keys=[SCHEDULE_KEY, LEASE_KEY_PREFIX + str(product_id)],
+            args=[token, time.time() + interval, product_id],
+        )
+        return interval
+
+    @staticmethod
+    def _update_stats(stats: dict[str, float], crawl: CrawlYield) -> dict[str, float]:
+        share = crawl.above_threshold / crawl.changed if crawl.changed else 0.0
+        if "new_rate" not in stats:
+            new_rate, margin_share = float(crawl.created), share
+        else:
+            new_rate = YIELD_ALPHA * crawl.created + (1 - YIELD_ALPHA) * stats["new_rate"]
+            margin_share = YIELD_ALPHA * share + (1 - YIELD_ALPHA) * stats["margin_share"]
+        cold_streak = 0 if crawl.created else min(stats.get("cold_streak", 0) + 1, MAX_COLD_STREAK)
+        return {"new_rate": new_rate, "margin_share": margin_share, "cold_streak": cold_streak}
+
+    def interval(self, stats: dict[str, float]) -> float:
+        """Sekunden bis zum nächsten Crawl eines Produkts."""
+        score = stats["new_rate"] * (1 + MARGIN_SHARE_WEIGHT * stats["margin_share"])
+        interval = self.base_interval / (1 + score) * 2 ** stats["cold_streak"]
+        return min(max(interval, self.min_interval), self.max_interval)
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import structlog
+from redis.asyncio import Redis
+
+from catalog import ProductCatalog
+from config import get_settings
+from control import ScraperControl
+from crawler import Crawler
+from fetcher import Fetcher
+from page_cache import CrawlCache
+from recheck import LivenessChecker
+from scheduler import CrawlScheduler
+
+
+logger = structlog.get_logger(__name__)
+
+# Wie oft im Leerlauf das Start-Flag geprüft wird
+CONTROL_POLL_SECONDS = 5
+# Fällige, aber von anderen Workern gehaltene Produkte nicht im Leerlauf abfragen
+IDLE_MIN_SLEEP_SECONDS = 1
+
+
+async def main() -> None:
+    settings = get_settings()
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    control = ScraperControl(redis)
+
+    async with (
+        Fetcher(
+            concurrency=settings.scraper_concurrency,
+            rate_per_host=settings.scraper_rate_per_host,
+            burst=settings.scraper_burst,
+            max_retries=settings.scraper_max_retries,
+            timeout=settings.scraper_timeout,
+            http2=settings.scraper_http2,
+            user_agent=settings.user_agent,
+        ) as fetcher,
+        httpx.AsyncClient(base_url=settings.backend_url, timeout=60.0) as backend,
+    ):
+        scheduler = CrawlScheduler(
+            redis,
+            base_interval=settings.scraper_cycle_interval,
+            min_interval=settings.scraper_min_interval,
+            max_interval=settings.scraper_max_interval,
+            lease_seconds=settings.scraper_lease_seconds,
+        )
+        catalog = ProductCatalog(backend, redis)
+        crawler = Crawler(fetcher, backend, control, CrawlCache(redis), scheduler, catalog, settings)
+        # Re-Check läuft nebenher und teilt sich Fetcher und Rate-Limit mit dem Crawler;
+        # die Referenzen halten die Tasks am Leben
+        checker = LivenessChecker(fetcher, backend, control, redis, settings)
+        recheck_task = asyncio.create_task(checker.run())
+        catalog_task = asyncio.create_task(catalog.run())
+        logger.info("scraper_started")
+
+        while True:
+            if not await control.should_run():
+                await crawler.report("stopped")
+                await asyncio.sleep(CONTROL_POLL_SECONDS)
+                continue
+
+            try:
+                if await crawler.run_cycle():
+                    continue
+            except Exception as e:
+                logger.error("crawl_cycle_failed", error=str(e))
+                await crawler.report("error", last_error=str(e))
+
+            # Nichts fällig: bis zum nächsten Fälligkeitstermin warten, Stop-Requests aber zeitnah bemerken
+            due_in = await scheduler.seconds_until_due()
+            await crawler.report("idle")
+            if due_in is None:
+                due_in = CONTROL_POLL_SECONDS
+            await asyncio.sleep(min(max(due_in, IDLE_MIN_SLEEP_SECONDS), CONTROL_POLL_SECONDS))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""Durchsatz des Notification-Dispatchers gegen einen Fake-Bot.
+
+Vergleicht den bisherigen seriellen Versand (ein Angebot = eine Nachricht pro Chat)
+mit dem Dispatcher (parallel, rate-limitiert, Digest).
+Aufruf aus dem telegram-bot-Verzeichnis:
+    python -m benchmarks.bench_dispatcher --offers 200 --chats 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from dispatcher import NotificationDispatcher, format_offer
+
+
+class FakeBot:
+    """Simuliert die Telegram-API-Latenz und zählt gesendete Nachrichten."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.messages = 0
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        await asyncio.sleep(self.latency)
+        self.messages += 1
+
+
+def build_offers(count: int) -> list[dict]:
+    return [
+        {
+            "title": f"RTX 3080 Founders Edition #{i}",
+            "price": 450.0,
+            "margin_percent": 25.0,
+            "url": f"https://www.kleinanzeigen.de/s-anzeige/{i}",
+        }
+        for i in range(count)
+    ]
+
+
+async def serial(offers: list[dict], chat_ids: list[int], latency: float) -> tuple[float, int]:
+    bot = FakeBot(latency)
+    started_at = time.perf_counter()
+    for offer in offers:
+        for chat_id in chat_ids:
+            await bot.send_message(chat_id=chat_id, text=format_offer(offer))
+    return time.perf_counter() - started_at, bot.messages
+
+
+async def dispatched(offers: list[dict], chat_ids: list[int], latency: float) -> tuple[float, int]:
+    bot = FakeBot(latency)
+    dispatcher = NotificationDispatcher(bot, chat_ids, digest_window=0.1)
+    started_at = time.perf_counter()
+    for offer in offers:
+        await dispatcher.notify_offer(offer)
+    await dispatcher._digest_task
+    return time.perf_counter() - started_at, bot.messages
+
+
+async def broadcast(messages: int, chat_ids: list[int], latency: float) -> tuple[float, int]:
+    """Reiner Fan-out ohne Digest: begrenzt durch die Telegram-Limits (global 30/s, 1/s pro Chat)."""
+    bot = FakeBot(latency)
+    dispatcher = NotificationDispatcher(bot, chat_ids)
+    started_at = time.perf_counter()
+    await asyncio.gather(*(dispatcher.broadcast(f"Nachricht {i}") for i in range(messages)))
+    return time.perf_counter() - started_at, bot.messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offers", type=int, default=200)
+    parser.add_argument("--chats", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    offers = build_offers(args.offers)
+    chat_ids = list(range(1, args.chats + 1))
+    latency = args.latency_ms / 1000
+
+    for name, run in (
+        ("serial", serial(offers, chat_ids, latency)),
+        ("dispatcher+digest", dispatched(offers, chat_ids, latency)),
+        ("broadcast x3", broadcast(3, chat_ids, latency)),
+    ):
+        seconds, messages = asyncio.run(run)
+        print(f"{name:<18} {messages:>5} messages in {seconds:6.2f} s ({messages / seconds:6.1f} msg/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
+import asyncio
 from functools import lru_cache
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from redis.asyncio import Redis
+
+from dispatcher import NotificationDispatcher
 
 
 class Settings(BaseSettings):
     telegram_bot_token: str
     # Kommagetrennter String aller Chat-IDs, z.B. "12345,67890"
     telegram_chat_ids: str
+    # Für die persistente Retry-Queue; ohne Redis werden fehlgeschlagene Nachrichten verworfen
+    redis_url: str | None = None
+    # Angebote innerhalb dieses Fensters (Sekunden) werden zu einem Digest zusammengefasst
+    telegram_digest_window: float = 5.0
+    # Abstand (Sekunden), in dem fällige Einträge der Retry-Queue erneut gesendet werden
+    telegram_retry_interval: float = 5.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -30,15 +40,58 @@ def get_settings() -> Settings:
     return Settings()
 
 
+_dispatcher: NotificationDispatcher | None = None
+
+
+def get_dispatcher(bot) -> NotificationDispatcher:
+    """Ein Dispatcher pro Bot-Instanz, damit Rate-Limits prozessweit gelten.
+
+    Aus dem laufenden Event-Loop aufrufen: der Retry-Loop startet mit dem Dispatcher.
+    """
+    global _dispatcher
+    if _dispatcher is None or _dispatcher.bot is not bot:
+        if _dispatcher is not None:
+            # Alter Bot: Retry-Loop und Digest-Fenster nicht weiterlaufen lassen
+            asyncio.get_running_loop().create_task(_close_dispatcher(_dispatcher))
+        settings = get_settings()
+        _dispatcher = NotificationDispatcher(
+            bot,
+            settings.telegram_chat_ids_list,
+            Redis.from_url(settings.redis_url, decode_responses=True) if settings.redis_url else None,
+            digest_window=settings.telegram_digest_window,
+            retry_interval=settings.telegram_retry_interval,
+        )
+        _dispatcher.start()
+    return _dispatcher
+
+
+async def shutdown() -> None:
+    """Beim Beenden des Bots aufrufen: offene Digests senden, Retry-Loop und Redis schließen."""
+    global _dispatcher
+    if _dispatcher is not None:
+        dispatcher, _dispatcher = _dispatcher, None
+        await _close_dispatcher(dispatcher)
+
+
+async def _close_dispatcher(dispatcher: NotificationDispatcher) -> None:
+    await dispatcher.close()
+    if dispatcher.redis is not None:
+        await dispatcher.redis.aclose()
+
+
 async def send_notification(bot, message: str) -> None:
     """
     Sende eine Nachricht an alle konfigurierten Chat-IDs.
 
     `bot` ist eine Instanz deines Telegram-Bots (z.B. aus python-telegram-bot oder aiogram),
     die eine async-Methode `send_message(chat_id=..., text=...)` besitzt.
+    Die Chats werden parallel und rate-limitiert beliefert (siehe `NotificationDispatcher`).
     """
-    settings = get_settings()
-    for chat_id in settings.telegram_chat_ids_list:
-        await bot.send_message(chat_id=chat_id, text=message)
+    await get_dispatcher(bot).broadcast(message)
+
+
+async def notify_offer(bot, offer: dict) -> None:
+    """Merke ein Angebot für den nächsten Digest vor, statt sofort einzeln zu senden."""
+    await get_dispatcher(bot).notify_offer(offer)
 
 
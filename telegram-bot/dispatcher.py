@@ -0,0 +1,210 @@
+import asyncio
+import contextlib
+import json
+import time
+from collections.abc import Iterable
+from datetime import timedelta
+from typing import Any
+
+import structlog
+from redis.asyncio import Redis
+
+
+logger = structlog.get_logger(__name__)
+
+# Telegram-Limits: ca. 30 Nachrichten/s pro Bot, 1 Nachricht/s pro Chat
+GLOBAL_RATE = 30.0
+PER_CHAT_RATE = 1.0
+MAX_MESSAGE_LENGTH = 4096
+
+RETRY_QUEUE_KEY = "telegram:retry"
+
+
+class TokenBucket:
+    """Token-Bucket: im Mittel `rate` Nachrichten pro Sekunde, Bursts bis `capacity`.
+
+    `pause` sperrt den Bucket für eine feste Zeit (Flood-Wait von Telegram).
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._updated_at:
+                    await asyncio.sleep(self._updated_at - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Keine Tokens bis `seconds` ab jetzt; danach füllt sich der Bucket leer wieder auf."""
+        resume_at = time.monotonic() + seconds
+        if resume_at > self._updated_at:
+            self._tokens = 0
+            self._updated_at = resume_at
+
+
+def format_offer(offer: dict[str, Any]) -> str:
+    margin = offer.get("margin_percent")
+    margin_text = f" | Marge {margin:.0f}%" if margin is not None else ""
+    return f"{offer['title']} – {offer['price']:.0f} €{margin_text}\n{offer['url']}"
+
+
+def build_digest(offers: list[dict[str, Any]]) -> list[str]:
+    """Fasse Angebote zu möglichst wenigen Nachrichten unter dem Telegram-Längenlimit zusammen."""
+    if len(offers) == 1:
+        return [format_offer(offers[0])]
+
+    messages = []
+    current = f"{len(offers)} neue Angebote:"
+    for offer in offers:
+        entry = "\n\n" + format_offer(offer)
+        if len(current) + len(entry) > MAX_MESSAGE_LENGTH:
+            messages.append(current)
+            current = entry.lstrip()
+        else:
+            current += entry
+    messages.append(current)
+    return messages
+
+
+class NotificationDispatcher:
+    """Verteilt Nachrichten parallel an alle Chats und hält dabei die Telegram-Limits ein.
+
+    - Token-Buckets global und pro Chat
+    - Angebote innerhalb von `digest_window` Sekunden werden zu einem Digest zusammengefasst
+    - `RetryAfter` (Flood-Wait) pausiert den globalen Bucket, also alle Chats; andere Fehler landen in einer Redis-Retry-Queue
+
+    `bot` muss eine async-Methode `send_message(chat_id=..., text=...)` besitzen.
+    `start` startet den Retry-Loop, `close` beendet ihn und sendet offene Digests.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        chat_ids: Iterable[int],
+        redis: Redis | None = None,
+        *,
+        global_rate: float = GLOBAL_RATE,
+        per_chat_rate: float = PER_CHAT_RATE,
+        digest_window: float = 5.0,
+        max_attempts: int = 5,
+        retry_interval: float = 5.0,
+    ) -> None:
+        self.bot = bot
+        self.chat_ids = list(chat_ids)
+        self.redis = redis
+        self.per_chat_rate = per_chat_rate
+        self.digest_window = digest_window
+        self.max_attempts = max_attempts
+        self.retry_interval = retry_interval
+        self.sent = 0
+        self.failed = 0
+
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self._pending_offers: list[dict[str, Any]] = []
+        self._digest_task: asyncio.Task | None = None
+        self._retry_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Retry-Loop im laufenden Event-Loop starten (nur mit Redis)."""
+        if self.redis is not None and (self._retry_task is None or self._retry_task.done()):
+            self._retry_task = asyncio.get_running_loop().create_task(self.run_retry_loop(self.retry_interval))
+
+    async def close(self) -> None:
+        """Shutdown: Retry-Loop beenden, den offenen Digest sofort senden."""
+        for task in (self._retry_task, self._digest_task):
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._retry_task = self._digest_task = None
+        await self.flush()
+
+    async def broadcast(self, text: str) -> None:
+        await asyncio.gather(*(self.send(chat_id, text) for chat_id in self.chat_ids))
+
+    async def notify_offer(self, offer: dict[str, Any]) -> None:
+        """Angebot für den nächsten Digest vormerken; der erste Eintrag startet das Zeitfenster."""
+        self._pending_offers.append(offer)
+        if self._digest_task is None or self._digest_task.done():
+            self._digest_task = asyncio.create_task(self._flush_after_window())
+
+    async def flush(self) -> None:
+        offers, self._pending_offers = self._pending_offers, []
+        for message in build_digest(offers) if offers else []:
+            await self.broadcast(message)
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.digest_window)
+        # Vor dem Versand freigeben: Angebote, die währenddessen kommen, starten ein neues Fenster
+        self._digest_task = None
+        await self.flush()
+
+    async def send(self, chat_id: int, text: str, attempt: int = 1) -> bool:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, 1)
+
+        while True:
+            await bucket.acquire()
+            await self._global_bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+            except Exception as e:
+                # python-telegram-bot: telegram.error.RetryAfter.retry_after (Sekunden oder timedelta)
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None:
+                    if isinstance(retry_after, timedelta):
+                        retry_after = retry_after.total_seconds()
+                    logger.warning("telegram_flood_wait", chat_id=chat_id, seconds=retry_after)
+                    # Der Flood-Wait gilt für den ganzen Bot, nicht nur für diesen Chat
+                    self._global_bucket.pause(float(retry_after))
+                    continue
+                logger.warning("telegram_send_failed", chat_id=chat_id, attempt=attempt, error=str(e))
+                await self._schedule_retry(chat_id, text, attempt)
+                return False
+            self.sent += 1
+            return True
+
+    async def _schedule_retry(self, chat_id: int, text: str, attempt: int) -> None:
+        if self.redis is None or attempt >= self.max_attempts:
+            self.failed += 1
+            logger.error("telegram_send_dropped", chat_id=chat_id, attempt=attempt)
+            return
+        due_at = time.time() + min(2**attempt, 300)
+        entry = json.dumps({"chat_id": chat_id, "text": text, "attempt": attempt + 1, "queued_at": time.time()})
+        await self.redis.zadd(RETRY_QUEUE_KEY, {entry: due_at})
+
+    async def process_retries(self, batch_size: int = 50) -> int:
+        """Fällige Einträge der Retry-Queue erneut senden; sicher bei mehreren Bot-Instanzen."""
+        if self.redis is None:
+            return 0
+        due = await self.redis.zrangebyscore(RETRY_QUEUE_KEY, "-inf", time.time(), start=0, num=batch_size)
+        claimed = []
+        for entry in due:
+            # Nur wer den Eintrag entfernt, sendet ihn
+            if await self.redis.zrem(RETRY_QUEUE_KEY, entry):
+                claimed.append(json.loads(entry))
+        await asyncio.gather(*(self.send(item["chat_id"], item["text"], item["attempt"]) for item in claimed))
+        return len(claimed)
+
+    async def run_retry_loop(self, interval: float = 5.0) -> None:
+        while True:
+            try:
+                await self.process_retries()
+            except Exception as e:
+                logger.error("telegram_retry_loop_failed", error=str(e))
+            await asyncio.sleep(interval)
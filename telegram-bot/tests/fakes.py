@@ -0,0 +1,51 @@
+"""Fake-Bot und Fake-Redis für die Dispatcher-Tests."""
+
+import asyncio
+import time
+from datetime import timedelta
+
+
+class RetryAfter(Exception):
+    """Wie telegram.error.RetryAfter: nur das Attribut `retry_after` zählt."""
+
+    def __init__(self, retry_after: float | timedelta) -> None:
+        super().__init__(f"Flood control exceeded. Retry in {retry_after}")
+        self.retry_after = retry_after
+
+
+class FakeBot:
+    """Zeichnet gesendete Nachrichten auf; `errors[chat_id]` wird vor dem Senden abgearbeitet."""
+
+    def __init__(self, errors: dict[int, list[Exception]] | None = None) -> None:
+        self.errors = errors or {}
+        self.messages: list[tuple[int, str, float]] = []
+        self.calls = 0
+        self.gate: asyncio.Event | None = None
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.errors.get(chat_id):
+            raise self.errors[chat_id].pop(0)
+        self.messages.append((chat_id, text, time.monotonic()))
+
+
+class FakeRedis:
+    """Sorted Set der Retry-Queue als dict {Eintrag: Fälligkeit}."""
+
+    def __init__(self) -> None:
+        self.queue: dict[str, float] = {}
+        self.closed = False
+
+    async def zadd(self, key: str, mapping: dict[str, float]) -> None:
+        self.queue.update(mapping)
+
+    async def zrangebyscore(self, key: str, low: str, high: float, start: int, num: int) -> list[str]:
+        return [entry for entry, score in sorted(self.queue.items(), key=lambda item: item[1]) if score <= high][:num]
+
+    async def zrem(self, key: str, entry: str) -> int:
+        return 1 if self.queue.pop(entry, None) is not None else 0
+
+    async def aclose(self) -> None:
+        self.closed = True
@@ -0,0 +1,53 @@
+"""bot.py: Dispatcher-Lebenszyklus mit Retry-Loop und Shutdown."""
+
+import asyncio
+import json
+
+import pytest
+
+import bot
+
+from .fakes import FakeBot, FakeRedis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    redis = FakeRedis()
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test")
+    monkeypatch.setenv("TELEGRAM_CHAT_IDS", "1,2")
+    monkeypatch.setenv("REDIS_URL", "redis://fake")
+    monkeypatch.setenv("TELEGRAM_DIGEST_WINDOW", "60")
+    monkeypatch.setenv("TELEGRAM_RETRY_INTERVAL", "0.02")
+    monkeypatch.setattr(bot.Redis, "from_url", lambda *args, **kwargs: redis)
+    bot.get_settings.cache_clear()
+    yield redis
+    bot.get_settings.cache_clear()
+    bot._dispatcher = None
+
+
+def test_retry_loop_resends_queued_messages(fake_redis: FakeRedis) -> None:
+    async def scenario() -> FakeBot:
+        telegram = FakeBot()
+        bot.get_dispatcher(telegram)
+        # Eintrag aus einem früheren Lauf, bereits fällig
+        fake_redis.queue[json.dumps({"chat_id": 1, "text": "a", "attempt": 2, "queued_at": 0})] = 0.0
+        await asyncio.sleep(0.1)
+        await bot.shutdown()
+        return telegram
+
+    telegram = asyncio.run(scenario())
+    assert [(chat_id, text) for chat_id, text, _ in telegram.messages] == [(1, "a")]
+    assert not fake_redis.queue and fake_redis.closed
+
+
+def test_shutdown_flushes_pending_digest(fake_redis: FakeRedis) -> None:
+    async def scenario() -> tuple[FakeBot, asyncio.Task]:
+        telegram = FakeBot()
+        await bot.notify_offer(telegram, {"title": "RTX 3080", "price": 450.0, "url": "https://example.org/1"})
+        retry_task = bot._dispatcher._retry_task
+        await bot.shutdown()
+        return telegram, retry_task
+
+    telegram, retry_task = asyncio.run(scenario())
+    assert sorted(chat_id for chat_id, _, _ in telegram.messages) == [1, 2]
+    assert retry_task.cancelled() and bot._dispatcher is None
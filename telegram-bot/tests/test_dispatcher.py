@@ -0,0 +1,96 @@
+"""Dispatcher gegen einen Fake-Bot: Digest-Fenster, Flood-Wait und Retry-Queue.
+
+Aufruf aus dem telegram-bot-Verzeichnis:
+    python -m pytest tests
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+from dispatcher import NotificationDispatcher
+
+from .fakes import FakeBot, FakeRedis, RetryAfter
+
+
+def offer(i: int) -> dict:
+    return {"title": f"RTX 3080 #{i}", "price": 450.0, "margin_percent": 25.0, "url": f"https://example.org/{i}"}
+
+
+def dispatcher(bot: FakeBot, chat_ids: list[int], **kwargs) -> NotificationDispatcher:
+    kwargs.setdefault("global_rate", 1000.0)
+    kwargs.setdefault("per_chat_rate", 1000.0)
+    return NotificationDispatcher(bot, chat_ids, **kwargs)
+
+
+def test_offers_within_window_are_coalesced() -> None:
+    async def scenario() -> FakeBot:
+        bot = FakeBot()
+        sender = dispatcher(bot, [1, 2], digest_window=0.05)
+        for i in range(3):
+            await sender.notify_offer(offer(i))
+        await asyncio.sleep(0.2)
+        return bot
+
+    bot = asyncio.run(scenario())
+    assert sorted(chat_id for chat_id, _, _ in bot.messages) == [1, 2]
+    assert all(text.startswith("3 neue Angebote:") for _, text, _ in bot.messages)
+
+
+def test_offer_arriving_during_flush_is_sent() -> None:
+    async def scenario() -> FakeBot:
+        bot = FakeBot()
+        bot.gate = asyncio.Event()
+        sender = dispatcher(bot, [1], digest_window=0.05)
+        await sender.notify_offer(offer(1))
+        # Erstes Fenster läuft ab, der Versand hängt am Gate
+        while bot.calls == 0:
+            await asyncio.sleep(0.01)
+        await sender.notify_offer(offer(2))
+        bot.gate.set()
+        await asyncio.sleep(0.2)
+        return bot
+
+    bot = asyncio.run(scenario())
+    texts = [text for _, text, _ in bot.messages]
+    assert len(texts) == 2
+    assert "#1" in texts[0] and "#2" in texts[1]
+
+
+def test_retry_after_pauses_all_chats() -> None:
+    async def scenario() -> tuple[FakeBot, float]:
+        bot = FakeBot(errors={1: [RetryAfter(timedelta(seconds=0.3))]})
+        sender = dispatcher(bot, [1, 2])
+        start = time.monotonic()
+        await asyncio.gather(sender.send(1, "a"), sender.send(2, "b"))
+        return bot, start
+
+    bot, start = asyncio.run(scenario())
+    assert sorted(chat_id for chat_id, _, _ in bot.messages) == [1, 2]
+    # Auch Chat 2 wartet den Flood-Wait ab
+    assert all(sent_at - start >= 0.3 for _, _, sent_at in bot.messages)
+
+
+def test_failed_send_is_retried_from_queue() -> None:
+    async def scenario() -> tuple[FakeBot, NotificationDispatcher, FakeRedis]:
+        bot = FakeBot(errors={1: [RuntimeError("Bad Gateway")]})
+        redis = FakeRedis()
+        sender = dispatcher(bot, [1], redis=redis)
+        assert not await sender.send(1, "a")
+        assert len(redis.queue) == 1
+        # Fälligkeit vorziehen statt 2 s zu warten
+        redis.queue = dict.fromkeys(redis.queue, 0.0)
+        assert await sender.process_retries() == 1
+        return bot, sender, redis
+
+    bot, sender, redis = asyncio.run(scenario())
+    assert [text for _, text, _ in bot.messages] == ["a"]
+    assert sender.sent == 1 and not redis.queue
+
+
+def test_send_is_dropped_after_max_attempts() -> None:
+    bot = FakeBot(errors={1: [RuntimeError("Bad Gateway")]})
+    sender = dispatcher(bot, [1], redis=FakeRedis(), max_attempts=1)
+
+    assert not asyncio.run(sender.send(1, "a"))
+    assert sender.failed == 1 and not sender.redis.queue